@@ -1,24 +1,74 @@
 from flask import request, jsonify
 import threading
 import hashlib
+import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+DEFAULT_POST_TIMEOUT = 45
+
+
+class TranscriptionCancelled(Exception):
+    """Raised at the next transcription stage once the request no longer needs the transcript."""
+
 
 def add_flask_route(
     app,
-    video_data,
-    save_video_data,
-    download_audio,
-    transcribe_audio,
+    video_store,
+    transcribe_video,
     summarize_text,
     get_video_details,
     post_to_telegram,
     post_to_discord,
     # post_to_twitter,
+    post_timeouts=None,
+    max_workers=8,
+    video_id_from_url=None,
 ):
     """
     Adds AI Agent routes to the Flask app.
     All necessary functions are passed in to avoid circular imports.
+    post_timeouts maps platform name to the seconds /ask_agent waits for that post.
+    video_id_from_url(url) returns the video id or None; transcription only starts
+    before the details lookup when it can tell which video the URL is.
     """
+    post_timeouts = post_timeouts or {}
+    video_id_from_url = video_id_from_url or (lambda url: None)
+    # Separate pools so long transcriptions never hold up details lookups or posting for other requests
+    pipeline_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='agent-pipeline')
+    details_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='agent-details')
+    post_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='agent-post')
+
+    def start_transcription(url, video_details):
+        """Submit transcribe_video; setting the returned event stops it at its next stage."""
+        cancelled = threading.Event()
+
+        def set_stage(stage):
+            if cancelled.is_set():
+                raise TranscriptionCancelled(f"Transcription cancelled before {stage}")
+
+        return pipeline_executor.submit(transcribe_video, url, video_details, set_stage), cancelled
+
+    def fan_out_posts(posts):
+        """
+        Run every platform post concurrently and collect the results. Each platform
+        is waited on until its own deadline; a post that misses it is reported as
+        timed out (the request itself keeps running in the background).
+        """
+        started = time.monotonic()
+        futures = {platform: post_executor.submit(post) for platform, post in posts.items()}
+        post_results = {}
+        for platform, future in futures.items():
+            timeout = post_timeouts.get(platform, DEFAULT_POST_TIMEOUT)
+            remaining = max(0.0, started + timeout - time.monotonic())
+            try:
+                post_results[platform] = future.result(timeout=remaining)
+            except FutureTimeoutError:
+                post_results[platform] = {"success": False, "error": f"{platform} post timed out after {timeout}s",
+                                          "timed_out": True}
+            except Exception as e:
+                post_results[platform] = {"success": False, "error": f"{platform} posting failed: {e}"}
+        return post_results
 
     @app.route("/ask_agent", methods=["POST"])
     def ask_agent():
@@ -32,52 +82,49 @@ def add_flask_route(
             if not youtube_url:
                 return jsonify({"success": False, "error": "Missing YouTube URL"}), 400
 
-            # Step 1: Download audio
-            audio_file = download_audio(youtube_url)
+            # Step 1: Fetch video details, and transcribe concurrently when the video id can
+            # be parsed from the URL (the transcript cache is keyed by that id)
+            details_future = details_executor.submit(get_video_details, youtube_url)
+            transcription = None
+            if video_id_from_url(youtube_url):
+                transcription = start_transcription(youtube_url, None)
+
+            video_details = details_future.result()
+            if not video_details:
+                if transcription:
+                    transcript_future, cancelled = transcription
+                    cancelled.set()
+                    transcript_future.cancel()
+                return jsonify({"success": False, "error": "Could not fetch video details"}), 400
+            if transcription is None:
+                transcription = start_transcription(youtube_url, video_details)
+            transcript_future = transcription[0]
 
-            # Step 2: Transcribe
-            transcript = transcribe_audio(audio_file)
+            # Step 2: Wait for the transcript (cached per video; downloads audio only on a miss)
+            transcript = transcript_future.result()
 
             # Step 3: Summarize
             summary = summarize_text(transcript)
 
-            # Step 4: Get video details
-            video_details = get_video_details(youtube_url)
-            if not video_details:
-                return jsonify({"success": False, "error": "Could not fetch video details"}), 400
-
-            # Step 5: Save to video_data
+            # Step 4: Save to the video store
             video_id = hashlib.md5(youtube_url.encode()).hexdigest()
-            video_data[video_id] = {
+            video_store.put(video_id, {
                 "transcript": transcript,
                 "summarized_transcript": summary,
                 "details": video_details,
                 "summaries": {"full": summary}
-            }
-            save_video_data(video_data)
+            })
 
-            # Step 6: Post to social media platforms
-            post_results = {}
+            # Step 5: Post to every platform in parallel, each with its own timeout
             video_title = video_details['title']
             thumbnail = video_details.get('thumbnail')
-
-            # Post to Telegram with photo
             telegram_message = f"🎥 <b>{video_title}</b>\n\n{summary}\n\n#YouTube #Summary"
-            telegram_result = post_to_telegram(telegram_message, photo_url=thumbnail)  # Keep photo_url here
-            post_results["telegram"] = telegram_result
-
-            # Post to Discord
-            discord_result = post_to_discord(summary, video_title, video_details)
-            post_results['discord'] = discord_result
-
-            # Twitter (with thumbnail)
-            # twitter_result = post_to_twitter(summary, thumbnail)
-            # post_results["twitter"] = twitter_result
-
-            # Clean up audio file
-            import os
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
+            post_results = fan_out_posts({
+                "telegram": lambda: post_to_telegram(telegram_message, photo_url=thumbnail),
+                "discord": lambda: post_to_discord(summary, video_title, video_details),
+                # Twitter (with thumbnail)
+                # "twitter": lambda: post_to_twitter(summary, thumbnail),
+            })
 
             return jsonify({
                 "success": True,
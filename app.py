@@ -2,23 +2,36 @@ import os
 from dotenv import load_dotenv
 # from pydub import AudioSegment
 import yt_dlp
-import whisper
-from transformers import pipeline, BartForConditionalGeneration, BartTokenizer
-import torch
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, session, redirect, url_for, Response, stream_with_context
 import tempfile
 import traceback
-import requests
 import json
+import re
 import hashlib
 import datetime
-import sqlite3
 import threading
-import time
+import random
+import socket
 from typing import Optional
 from functools import wraps
 import logging
 import urllib.parse  # needed for encoding share URLs
+import uuid
+from job_queue import JobQueue, QueueFullError, FINISHED_STATES
+from transcript_cache import TranscriptCache
+from summary_cache import SummaryCache, summary_cache_key
+from video_store import VideoStore, VideoStoreView
+from json_store import JsonFileStore
+from scheduler import PostScheduler, PostDispatcher, LeaseRenewer
+import db
+import http_client
+from rate_limiter import RateLimiter, RateLimitExceeded
+from transcriber import describe as describe_transcriber
+from models import ModelRegistry
+import model_loaders
+from summarization import SUMMARY_CHUNK_TOKENS, SUMMARY_CHUNK_OVERLAP, generate_summary, generate_summaries
+from audio_stream import AudioStreamError, SAMPLE_RATE, load_audio
+from inference_server import InferenceClient, parse_address, authkey_from_env, register_remote_models
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -38,6 +51,10 @@ DISCORD_CHANNEL_ID = os.getenv('DISCORD_CHANNEL_ID')
 
 discord_configured = bool(DISCORD_BOT_TOKEN) and bool(DISCORD_CHANNEL_ID)
 
+# Outbound pacing per platform and chat/channel. Sends wait up to RATE_LIMIT_MAX_WAIT
+# seconds for a token; longer waits are returned as a retryable failure with retry_after
+rate_limiter = RateLimiter(max_wait=float(os.getenv('RATE_LIMIT_MAX_WAIT', '30')))
+
 
 # Check if required environment variables are set
 # def check_environment():
@@ -87,32 +104,66 @@ def check_environment():
 check_environment()
 
 # -------------------------------
-# Device setup
+# Models (loaded on first use or by the background warm-up, never at import)
 # -------------------------------
-device = "cuda" if torch.cuda.is_available() else "cpu"
-print("Using device:", device)
+# With INFERENCE_SERVER_ADDRESS set, models live in a shared inference server process
+# (python inference_server.py) instead of being loaded by every web worker; both sides
+# need the same INFERENCE_SERVER_AUTHKEY
+INFERENCE_SERVER_ADDRESS = os.getenv('INFERENCE_SERVER_ADDRESS')
 
-# -------------------------------
-# Load models
-# -------------------------------
-model = whisper.load_model("base")
+models = ModelRegistry()
+if INFERENCE_SERVER_ADDRESS:
+    inference_client = InferenceClient(parse_address(INFERENCE_SERVER_ADDRESS), authkey_from_env())
+    register_remote_models(models, inference_client)
+    print(f"✅ Using inference server at {INFERENCE_SERVER_ADDRESS}")
+else:
+    inference_client = None
+    model_loaders.register_local_models(models)
 
-# Load a better summarization model
-try:
-    # Try to use BART model for better summarization
-    summarization_model_name = "facebook/bart-large-cnn"
-    summarizer = pipeline(
-        "summarization",
-        model=summarization_model_name,
-        tokenizer=summarization_model_name,
-        device=0 if device == "cuda" else -1
-    )
-    print("✅ Using BART model for summarization")
-except Exception as e:
-    print(f"⚠️  Could not load BART model, using default: {e}")
-    summarizer = pipeline("summarization", device=0 if device == "cuda" else -1)
 
-print("✅ Models loaded: Whisper (transcription) and Transformers (summarization)")
+def get_transcriber():
+    return models.get('transcriber')
+
+
+def get_summarizer():
+    return models.get('summarizer')
+
+
+_transcription_identity = None
+
+
+def transcription_identity():
+    """(model name, version) keying the transcript cache; needs no loaded model."""
+    global _transcription_identity
+    if _transcription_identity is None:
+        if inference_client:
+            _transcription_identity = tuple(inference_client.call('identity')['transcription'])
+        else:
+            _transcription_identity = model_loaders.transcription_identity()
+    return _transcription_identity
+
+
+def summarization_model_name():
+    """
+    Name keying the summary cache, without loading the summarizer: the configured
+    model and engine (the server's, when models are remote) until it loads, then the
+    one that actually loaded ("default" after a fallback). Summaries are stored under
+    a key built after generation, so they always name the model that produced them.
+    """
+    if inference_client:
+        if models.is_loaded('summarizer'):
+            return get_summarizer().model_name
+        return inference_client.call('identity')['summarization_model']
+    return model_loaders.summarization_model_name
+
+
+# Models loaded in the background at startup; /ready reports 503 until they are.
+# Set MODEL_WARMUP= (empty) for admin- or scheduler-only processes that never need them.
+WARMUP_MODELS = [name.strip() for name in os.getenv('MODEL_WARMUP', 'transcriber,summarizer').split(',') if name.strip()]
+
+# Persistent memo of generated summaries (transcript hash + generation parameters)
+summary_cache = SummaryCache(os.getenv('SUMMARY_CACHE_DB', 'summary_cache.db'),
+                             max_entries=int(os.getenv('SUMMARY_CACHE_MAX_ENTRIES', '5000')))
 
 
 # -------------------------------
@@ -125,30 +176,56 @@ def get_video_id(url):
 
 
 def download_audio(url, output_name="audio/audio"):
+    """
+    Download the best audio format as-is (webm/m4a) and return its path. The
+    transcriber decodes it directly, so there is no MP3 re-encode in between.
+    """
     os.makedirs("audio", exist_ok=True)
     ydl_opts = {
         'format': 'bestaudio/best',
-        'outtmpl': output_name,
+        'outtmpl': output_name + '.%(ext)s',
         'quiet': True,
         'no_warnings': True,
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '192',
-        }],
     }
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-        ydl.download([url])
-    return output_name + ".mp3"
+        info = ydl.extract_info(url, download=True)
+        return ydl.prepare_filename(info)
+
+
+# Decode the audio stream straight to 16 kHz PCM in memory instead of downloading
+# a file first; set to 0 to always download
+AUDIO_STREAMING = os.getenv('AUDIO_STREAMING', '1') == '1'
+
+
+def transcribe_stream(url, set_stage):
+    """
+    Transcribe a video by having ffmpeg decode its audio stream to 16 kHz mono PCM
+    as it downloads, handed to the transcriber in memory. Raises AudioStreamError
+    if the stream can't be resolved or decoded.
+    """
+    if inference_client is not None:
+        # The inference server streams and decodes the audio itself
+        set_stage('transcribing')
+        result = get_transcriber().transcribe_url(url)
+    else:
+        set_stage('downloading')
+        audio = load_audio(url)
+        set_stage('transcribing')
+        print(f"Transcribing {len(audio) / SAMPLE_RATE:.0f}s of streamed audio")
+        result = model_loaders.transcribe_file(models, audio)
+    transcript = result['text'].strip()
+    print(f"Transcription completed. Length: {len(transcript)} characters")
+    return transcript
 
 
 def transcribe_audio(file_path):
     """
-    Transcribe audio without splitting into chunks
+    Transcribe audio in one pass, or split at silences across worker processes when
+    parallel transcription is enabled and the file is long enough
     """
     try:
         print(f"Transcribing audio file: {file_path}")
-        result = model.transcribe(file_path)
+        result = model_loaders.transcribe_file(models, file_path)
         transcript = result['text'].strip()
         print(f"Transcription completed. Length: {len(transcript)} characters")
         return transcript
@@ -157,112 +234,169 @@ def transcribe_audio(file_path):
         raise
 
 
-def chunk_text_for_summarization(text, max_chunk_size=1024):
+transcript_cache = TranscriptCache(os.getenv('TRANSCRIPT_CACHE_DIR', 'transcript_cache'))
+
+
+YOUTUBE_ID_PATTERN = re.compile(r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([A-Za-z0-9_-]{11})')
+
+
+def youtube_video_id(url):
+    """Canonical 11-character YouTube id parsed from the URL, or None if it isn't recognised."""
+    match = YOUTUBE_ID_PATTERN.search(url or '')
+    return match.group(1) if match else None
+
+
+def transcribe_video(url, video_details=None, set_stage=None):
     """
-    Split text into chunks suitable for summarization while preserving sentence boundaries
+    Return the transcript for a video, served from the transcript cache when the
+    canonical video id was already transcribed with the current transcription model.
+    Otherwise transcribe the streamed audio and cache the result, falling back to
+    downloading an audio file when the stream can't be decoded.
+
+    video_details may be None when the details are still being fetched; the id is
+    then parsed from the URL (it is the same id yt_dlp reports).
     """
-    sentences = text.split('. ')
-    chunks = []
-    current_chunk = ""
+    set_stage = set_stage or (lambda stage: None)
+    canonical_id = (video_details or {}).get('video_id') or youtube_video_id(url)
+    model_name, model_version = transcription_identity()
+    transcript = transcript_cache.get(canonical_id, model_name, model_version)
+    if transcript is not None:
+        logger.info(f"Transcript cache hit for video {canonical_id}")
+        return transcript
 
-    for sentence in sentences:
-        # If adding this sentence would exceed max chunk size, save current chunk and start new one
-        if len(current_chunk) + len(sentence) + 2 > max_chunk_size and current_chunk:
-            chunks.append(current_chunk.strip())
-            current_chunk = sentence + '. '
-        else:
-            current_chunk += sentence + '. '
+    transcript = None
+    if AUDIO_STREAMING:
+        try:
+            transcript = transcribe_stream(url, set_stage)
+        except AudioStreamError as e:
+            logger.warning(f"Streaming audio for {canonical_id} failed, downloading instead: {e}")
 
-    # Add the last chunk if it's not empty
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
+    if transcript is None:
+        # Download audio (unique file name so concurrent requests don't clobber each other)
+        set_stage('downloading')
+        audio_file = download_audio(url, output_name=f"audio/{uuid.uuid4().hex}")
 
-    print(f"Split text into {len(chunks)} chunks for summarization")
-    return chunks
+        try:
+            # Transcribe without chunking
+            set_stage('transcribing')
+            transcript = transcribe_audio(audio_file)
+        finally:
+            # Clean up audio file
+            if os.path.exists(audio_file):
+                os.remove(audio_file)
+
+    transcript_cache.put(canonical_id, model_name, model_version, transcript)
+    return transcript
 
 
 def summarize_text(text, max_length=150):
     """
-    Improved summarization with better chunking and handling of long texts
+    Improved summarization with better chunking and handling of long texts.
+    Results are memoized in the summary cache; fallback summaries are not cached.
     """
     if not text or len(text.strip()) < 100:
         return "Text too short for meaningful summary."
 
+    # Clean and preprocess text
+    text = text.replace('\n', ' ').strip()
+
     try:
-        # Clean and preprocess text
-        text = text.replace('\n', ' ').strip()
-
-        # If text is short, summarize directly
-        if len(text) < 800:
-            summary = summarizer(
-                text,
-                max_length=max_length,
-                min_length=max(30, max_length // 3),
-                do_sample=False,
-                truncation=True
-            )
-            return summary[0]['summary_text']
-
-        # For longer texts, use chunking strategy
-        chunks = chunk_text_for_summarization(text)
-
-        if len(chunks) == 1:
-            # Single chunk - summarize directly
-            summary = summarizer(
-                chunks[0],
-                max_length=max_length,
-                min_length=max(30, max_length // 3),
-                do_sample=False,
-                truncation=True
-            )
-            return summary[0]['summary_text']
-        else:
-            # Multiple chunks - summarize each and combine
-            chunk_summaries = []
-            for i, chunk in enumerate(chunks):
-                try:
-                    chunk_max_len = max(min(max_length // len(chunks), 100), 50)
-                    chunk_summary = summarizer(
-                        chunk,
-                        max_length=chunk_max_len,
-                        min_length=max(20, chunk_max_len // 3),
-                        do_sample=False,
-                        truncation=True
-                    )
-                    chunk_summaries.append(chunk_summary[0]['summary_text'])
-                    print(f"Summarized chunk {i + 1}/{len(chunks)}")
-                except Exception as e:
-                    print(f"Error summarizing chunk {i + 1}: {e}")
-                    # Fallback: take first few sentences
-                    sentences = chunk.split('. ')
-                    chunk_summaries.append('. '.join(sentences[:3]) + '.')
-
-            # Combine chunk summaries and create final summary
-            combined_text = ' '.join(chunk_summaries)
-
-            # If combined text is still long, do a final summarization
-            if len(combined_text) > 500:
-                final_summary = summarizer(
-                    combined_text,
-                    max_length=max_length,
-                    min_length=max(30, max_length // 3),
-                    do_sample=False,
-                    truncation=True
-                )
-                return final_summary[0]['summary_text']
-            else:
-                return combined_text
+        key = summary_key(text, max_length)
+    except Exception as e:
+        print(f"Could not build summary cache key: {e}")
+        return extractive_fallback_summary(text)
+    cached = summary_cache.get(key)
+    if cached is not None:
+        return cached
 
+    try:
+        summary = generate_summary(get_summarizer(), text, max_length)
     except Exception as e:
         print(f"Summarization error: {e}")
-        # Fallback: return the most important parts
-        sentences = text.split('. ')
-        if len(sentences) > 10:
-            # Take first 3 and last 2 sentences for context
-            important_sentences = sentences[:3] + sentences[-2:]
-            return '. '.join(important_sentences) + '.'
+        return extractive_fallback_summary(text)
+
+    # Rebuilt now the summarizer is loaded, in case it fell back to another model
+    summary_cache.put(summary_key(text, max_length), summary)
+    return summary
+
+
+def summary_key(text, max_length, budget_length=None):
+    """
+    Summary cache key: transcript hash plus model, generation and chunking parameters.
+    `budget_length` is the length the per-chunk summary budget was derived from: the
+    summary's own max_length for summarize_text, the largest requested length for a
+    shared summarize_text_multi pass.
+    """
+    return summary_cache_key(
+        text,
+        model=summarization_model_name(),
+        max_length=max_length,
+        min_length=max(30, max_length // 3),
+        chunk_tokens=SUMMARY_CHUNK_TOKENS,
+        chunk_overlap=SUMMARY_CHUNK_OVERLAP,
+        chunk_budget_length=budget_length or max_length
+    )
+
+
+def extractive_fallback_summary(text):
+    """
+    Fallback when the model fails: return the most important parts of the text
+    """
+    sentences = text.split('. ')
+    if len(sentences) > 10:
+        # Take first 3 and last 2 sentences for context
+        important_sentences = sentences[:3] + sentences[-2:]
+        return '. '.join(important_sentences) + '.'
+    else:
+        return text
+
+
+def summarize_text_multi(text, max_lengths):
+    """
+    Summarize the same text for several target lengths in one pass.
+
+    The text is chunked once and every chunk is summarized once (batched), using the
+    largest per-chunk budget any requested length needs; only the final pass over the
+    combined chunk summaries runs per length. Lengths already in the summary cache are
+    not regenerated. Returns {max_length: summary}.
+    """
+    if not text or len(text.strip()) < 100:
+        return {max_length: "Text too short for meaningful summary." for max_length in max_lengths}
+
+    # Clean and preprocess text
+    text = text.replace('\n', ' ').strip()
+
+    try:
+        # Every length shares the chunk budget of the largest one, cached or not
+        budget_length = max(max_lengths)
+        keys = {max_length: summary_key(text, max_length, budget_length) for max_length in max_lengths}
+    except Exception as e:
+        print(f"Could not build summary cache key: {e}")
+        return {max_length: extractive_fallback_summary(text) for max_length in max_lengths}
+
+    summaries = {}
+    missing = []
+    for max_length in max_lengths:
+        cached = summary_cache.get(keys[max_length])
+        if cached is not None:
+            summaries[max_length] = cached
         else:
-            return text
+            missing.append(max_length)
+    if not missing:
+        return summaries
+
+    try:
+        generated = generate_summaries(get_summarizer(), text, missing, budget_length=budget_length)
+    except Exception as e:
+        print(f"Summarization error: {e}")
+        fallback = extractive_fallback_summary(text)
+        summaries.update({max_length: fallback for max_length in missing})
+        return summaries
+
+    for max_length, summary in generated.items():
+        summary_cache.put(summary_key(text, max_length, budget_length), summary)
+    summaries.update(generated)
+    return summaries
 
 
 def get_video_details(url):
@@ -305,7 +439,7 @@ def post_to_telegram(message, photo_url=None):
     if not TELEGRAM_BOT_TOKEN or not TELEGRAM_CHAT_ID:
         error_msg = "Telegram credentials not configured"
         print(f"❌ Telegram Error: {error_msg}")
-        return {"success": False, "error": error_msg}
+        return {"success": False, "error": error_msg, "retryable": False}
 
     try:
         print(f"📱 Attempting to post to Telegram...")
@@ -349,7 +483,7 @@ def post_to_telegram(message, photo_url=None):
                 "parse_mode": "HTML"
             }
 
-            response = requests.post(url, data=photo_data, timeout=30)
+            response = telegram_post(url, photo_data)
             print(f"   Photo Response Status: {response.status_code}")
             print(f"   Photo Response Text: {response.text}")
 
@@ -372,7 +506,12 @@ def post_to_telegram(message, photo_url=None):
                         "parse_mode": "HTML"
                     }
 
-                    message_response = requests.post(message_url, data=message_data, timeout=30)
+                    try:
+                        message_response = telegram_post(message_url, message_data)
+                    except RateLimitExceeded as e:
+                        # The photo is already out; don't fail (and retry) the whole post
+                        print(f"⚠️  Photo sent but additional content was rate limited: {e}")
+                        return {"success": True, "message": "✅ Photo posted, but additional content was rate limited"}
                     if message_response.status_code == 200:
                         print("✅ Additional content sent successfully!")
                         return {"success": True,
@@ -385,7 +524,8 @@ def post_to_telegram(message, photo_url=None):
             else:
                 error_msg = f"Telegram API error: {response.text}"
                 print(f"❌ {error_msg}")
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg, "status_code": response.status_code,
+                        "retry_after": telegram_retry_after(response)}
         else:
             # No photo, just send the message
             print(f"   Using sendMessage API")
@@ -402,7 +542,7 @@ def post_to_telegram(message, photo_url=None):
                 "parse_mode": "HTML"
             }
 
-            response = requests.post(url, data=data, timeout=30)
+            response = telegram_post(url, data)
             print(f"   Response Status: {response.status_code}")
             print(f"   Response Text: {response.text}")
 
@@ -412,8 +552,13 @@ def post_to_telegram(message, photo_url=None):
             else:
                 error_msg = f"Telegram API error: {response.text}"
                 print(f"❌ {error_msg}")
-                return {"success": False, "error": error_msg}
+                return {"success": False, "error": error_msg, "status_code": response.status_code,
+                        "retry_after": telegram_retry_after(response)}
 
+    except RateLimitExceeded as e:
+        error_msg = f"Telegram posting deferred: {e}"
+        print(f"⏳ {error_msg}")
+        return {"success": False, "error": error_msg, "retry_after": e.retry_after}
     except Exception as e:
         error_msg = f"Telegram posting failed: {str(e)}"
         print(f"❌ {error_msg}")
@@ -454,9 +599,41 @@ def create_telegram_safe_message(video_title, summary, max_caption_length=900):
     return caption
 
 
+def telegram_post(url, data):
+    """POST to the Telegram Bot API, paced by the per-chat and global rate limits."""
+    rate_limiter.acquire('telegram', data['chat_id'])
+    response = http_client.post(url, data=data)
+    rate_limiter.observe('telegram', data['chat_id'], response,
+                         retry_after=telegram_retry_after(response) if response.status_code == 429 else None)
+    return response
+
+
+def telegram_retry_after(response):
+    """Seconds Telegram asks us to wait (parameters.retry_after on 429), or None."""
+    try:
+        return response.json().get('parameters', {}).get('retry_after')
+    except Exception:
+        return None
+
+
+def discord_retry_after(response):
+    """Seconds Discord asks us to wait (retry_after body field or Retry-After header on 429), or None."""
+    try:
+        retry_after = response.json().get('retry_after')
+        if retry_after is not None:
+            return float(retry_after)
+    except Exception:
+        pass
+    header = response.headers.get('Retry-After')
+    try:
+        return float(header) if header else None
+    except ValueError:
+        return None
+
+
 def post_to_discord(summary, video_title, video_details):
     if not discord_configured:
-        return {"success": False, "error": "Discord bot not configured"}
+        return {"success": False, "error": "Discord bot not configured", "retryable": False}
     try:
         headers = {'Authorization': f'Bot {DISCORD_BOT_TOKEN}', 'Content-Type': 'application/json'}
         embed = {
@@ -478,12 +655,18 @@ def post_to_discord(summary, video_title, video_details):
             embed["thumbnail"] = {"url": thumbnail}
         data = {"embeds": [embed], "content": "📺 **New YouTube Video Summary**"}
         url = f"https://discord.com/api/v10/channels/{DISCORD_CHANNEL_ID}/messages"
-        response = requests.post(url, headers=headers, json=data)
+        rate_limiter.acquire('discord', DISCORD_CHANNEL_ID)
+        response = http_client.post(url, headers=headers, json=data)
+        rate_limiter.observe('discord', DISCORD_CHANNEL_ID, response,
+                             retry_after=discord_retry_after(response) if response.status_code == 429 else None)
         if response.status_code == 200:
             message_data = response.json()
             return {"success": True, "message": "Posted to Discord successfully"}
         else:
-            return {"success": False, "error": f"Discord API error: {response.text}"}
+            return {"success": False, "error": f"Discord API error: {response.text}",
+                    "status_code": response.status_code, "retry_after": discord_retry_after(response)}
+    except RateLimitExceeded as e:
+        return {"success": False, "error": f"Discord posting deferred: {e}", "retry_after": e.retry_after}
     except Exception as e:
         return {"success": False, "error": f"Discord posting failed: {str(e)}"}
 
@@ -584,146 +767,262 @@ VIDEO_DATA_FILE = "video_data.json"
 USER_DB_FILE = "users.json"
 
 
-def load_user_db():
-    try:
-        if os.path.exists(USER_DB_FILE):
-            with open(USER_DB_FILE, 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading user db: {e}")
-    return {}
+# User document shared by every worker; bursts of logins are coalesced into one locked, merged write
+user_store = JsonFileStore(USER_DB_FILE, flush_delay=float(os.getenv('USER_DB_FLUSH_DELAY', '1.0')))
 
 
-def save_user_db(db):
-    try:
-        with open(USER_DB_FILE, 'w') as f:
-            json.dump(db, f)
-    except Exception as e:
-        logger.error(f"Error saving user db: {e}")
+def load_user_db():
+    return user_store.read()
 
 
-def load_video_data():
-    """Load video data from JSON file"""
-    try:
-        if os.path.exists(VIDEO_DATA_FILE):
-            with open(VIDEO_DATA_FILE, 'r') as f:
-                return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading video data: {e}")
-    return {}
+# Videos live in SQLite; video_data.json is imported once on first start
+VIDEO_DB_FILE = os.getenv('VIDEO_DB_FILE', 'video_data.db')
+video_store = VideoStore(VIDEO_DB_FILE)
+video_store.migrate_from_json(VIDEO_DATA_FILE)
+logger.info(f"Video store ready with {len(video_store)} videos")
 
+# Shared read-through view for hot paths; refreshes only videos written since the last access
+video_view = VideoStoreView(video_store)
 
-def save_video_data(video_data):
-    """Save video data to JSON file"""
-    try:
-        with open(VIDEO_DATA_FILE, 'w') as f:
-            json.dump(video_data, f)
-    except Exception as e:
-        logger.error(f"Error saving video data: {e}")
-
+DB_FILE = "schedules.db"
 
-# Load video data at startup
-video_data = load_video_data()
-logger.info(f"Loaded video data for {len(video_data)} videos")
 
-DB_FILE = "schedules.db"
+# Versioned schema migrations for schedules.db (applied version tracked in PRAGMA user_version).
+# Append new migrations; never edit one that has shipped.
+SCHEDULE_MIGRATIONS = [
+    (1, "create scheduled_posts", [
+        """
+        CREATE TABLE IF NOT EXISTS scheduled_posts
+        (
+            id                INTEGER PRIMARY KEY AUTOINCREMENT,
+            video_id          TEXT NOT NULL,
+            platform          TEXT NOT NULL,
+            schedule_time_utc TEXT NOT NULL,
+            status            TEXT NOT NULL,
+            attempt_count     INTEGER DEFAULT 0,
+            last_result       TEXT    DEFAULT NULL,
+            created_at        TEXT NOT NULL
+        )
+        """,
+    ]),
+    (2, "index due-post lookup, admin sort and video_id", [
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status_time ON scheduled_posts (status, schedule_time_utc)",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_schedule_time ON scheduled_posts (schedule_time_utc)",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_video_id ON scheduled_posts (video_id)",
+    ]),
+    (3, "add retry and leasing columns", [
+        "ALTER TABLE scheduled_posts ADD COLUMN next_attempt_at TEXT DEFAULT NULL",
+        "ALTER TABLE scheduled_posts ADD COLUMN locked_by TEXT DEFAULT NULL",
+        "ALTER TABLE scheduled_posts ADD COLUMN lease_expires_at TEXT DEFAULT NULL",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status_next_attempt ON scheduled_posts (status, next_attempt_at)",
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_lease ON scheduled_posts (locked_by, lease_expires_at)",
+    ]),
+    (4, "index expired-lease reclaim", [
+        "CREATE INDEX IF NOT EXISTS idx_scheduled_posts_status_lease ON scheduled_posts (status, lease_expires_at)",
+    ]),
+]
 
 
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""
-              CREATE TABLE IF NOT EXISTS scheduled_posts
-              (
-                  id
-                  INTEGER
-                  PRIMARY
-                  KEY
-                  AUTOINCREMENT,
-                  video_id
-                  TEXT
-                  NOT
-                  NULL,
-                  platform
-                  TEXT
-                  NOT
-                  NULL,
-                  schedule_time_utc
-                  TEXT
-                  NOT
-                  NULL,
-                  status
-                  TEXT
-                  NOT
-                  NULL,
-                  attempt_count
-                  INTEGER
-                  DEFAULT
-                  0,
-                  last_result
-                  TEXT
-                  DEFAULT
-                  NULL,
-                  created_at
-                  TEXT
-                  NOT
-                  NULL
-              );
-              """)
-    conn.commit()
-    conn.close()
-    logger.info("Database initialized")
+    version = db.migrate(DB_FILE, SCHEDULE_MIGRATIONS)
+    logger.info(f"Database initialized (schema version {version})")
 
 
 init_db()
 
 
 def insert_scheduled_post(video_id: str, platform: str, schedule_dt_utc: datetime.datetime):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""
-              INSERT INTO scheduled_posts (video_id, platform, schedule_time_utc, status, created_at)
-              VALUES (?, ?, ?, 'scheduled', ?)
-              """, (video_id, platform, schedule_dt_utc.isoformat(), datetime.datetime.utcnow().isoformat()))
-    conn.commit()
-    row_id = c.lastrowid
-    conn.close()
+    with db.connection(DB_FILE) as conn:
+        c = conn.execute("""
+                         INSERT INTO scheduled_posts (video_id, platform, schedule_time_utc, status, created_at)
+                         VALUES (?, ?, ?, 'scheduled', ?)
+                         """, (video_id, platform, schedule_dt_utc.isoformat(), datetime.datetime.utcnow().isoformat()))
+        row_id = c.lastrowid
     logger.info(f"Scheduled post {row_id} for video {video_id} on {platform} at {schedule_dt_utc}")
+    # Wake the scheduler if this post is due before anything it is waiting on
+    wake_scheduler(row_id, schedule_dt_utc)
     return row_id
 
 
+def lease_condition(lease_owner: Optional[str]):
+    """WHERE clause suffix and parameters restricting an update to rows still leased by `lease_owner`."""
+    if lease_owner is None:
+        return "", ()
+    return " AND status = 'posting' AND locked_by = ?", (lease_owner,)
+
+
 def update_scheduled_post_status(row_id: int, status: str, last_result: Optional[str] = None,
-                                 attempt_count: Optional[int] = None):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    if attempt_count is None:
-        c.execute("UPDATE scheduled_posts SET status = ?, last_result = ? WHERE id = ?", (status, last_result, row_id))
+                                 attempt_count: Optional[int] = None, lease_owner: Optional[str] = None) -> bool:
+    """
+    Set a post's status; any status other than 'posting' releases the row's lease.
+    With `lease_owner`, the update only applies while that worker still holds the
+    lease, so a worker whose lease expired can't overwrite the row's new owner.
+    """
+    condition, condition_params = lease_condition(lease_owner)
+    with db.connection(DB_FILE) as conn:
+        if attempt_count is None:
+            updated = conn.execute("""
+                                   UPDATE scheduled_posts
+                                   SET status = ?, last_result = ?, locked_by = NULL, lease_expires_at = NULL
+                                   WHERE id = ?""" + condition,
+                                   (status, last_result, row_id) + condition_params).rowcount > 0
+        else:
+            updated = conn.execute("""
+                                   UPDATE scheduled_posts
+                                   SET status = ?, last_result = ?, attempt_count = ?, locked_by = NULL,
+                                       lease_expires_at = NULL
+                                   WHERE id = ?""" + condition,
+                                   (status, last_result, attempt_count, row_id) + condition_params).rowcount > 0
+    release_lease(row_id)
+    if updated:
+        logger.info(f"Updated post {row_id} to status: {status}")
+    else:
+        logger.warning(f"Post {row_id} not updated to {status}: lease lost or post missing")
+    return updated
+
+
+def schedule_post_retry(row_id: int, last_result: str, attempt_count: int, next_attempt_at: datetime.datetime,
+                        lease_owner: Optional[str] = None) -> bool:
+    condition, condition_params = lease_condition(lease_owner)
+    with db.connection(DB_FILE) as conn:
+        updated = conn.execute("""
+                               UPDATE scheduled_posts
+                               SET status          = 'retrying',
+                                   last_result     = ?,
+                                   attempt_count   = ?,
+                                   next_attempt_at = ?,
+                                   locked_by        = NULL,
+                                   lease_expires_at = NULL
+                               WHERE id = ?""" + condition,
+                               (last_result, attempt_count, next_attempt_at.isoformat(), row_id) + condition_params
+                               ).rowcount > 0
+    release_lease(row_id)
+    if updated:
+        logger.info(f"Post {row_id} will retry at {next_attempt_at}")
     else:
-        c.execute("UPDATE scheduled_posts SET status = ?, last_result = ?, attempt_count = ? WHERE id = ?",
-                  (status, last_result, attempt_count, row_id))
-    conn.commit()
-    conn.close()
-    logger.info(f"Updated post {row_id} to status: {status}")
-
-
-def get_due_scheduled_posts(limit=10):
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    now = datetime.datetime.utcnow().isoformat()
-    c.execute("""
-              SELECT id, video_id, platform
-              FROM scheduled_posts
-              WHERE status = 'scheduled'
-                AND schedule_time_utc <= ?
-              ORDER BY schedule_time_utc ASC LIMIT ?
-              """, (now, limit))
-    rows = c.fetchall()
-    conn.close()
+        logger.warning(f"Post {row_id} retry not recorded: lease lost or post missing")
+    return updated
+
+
+def requeue_scheduled_post(row_id: int) -> bool:
+    """Move a dead (or failed) post back to 'scheduled' with a fresh attempt budget; it becomes due immediately."""
+    with db.connection(DB_FILE) as conn:
+        updated = conn.execute("""
+                               UPDATE scheduled_posts
+                               SET status          = 'scheduled',
+                                   attempt_count   = 0,
+                                   next_attempt_at = NULL,
+                                   last_result     = 'Re-queued by admin'
+                               WHERE id = ?
+                                 AND status IN ('dead', 'failed')
+                               """, (row_id,)).rowcount > 0
+    if updated:
+        wake_scheduler(row_id, datetime.datetime.utcnow())
+        logger.info(f"Re-queued post {row_id}")
+    return updated
+
+
+def wake_scheduler(row_id, due_at):
+    """
+    Time a post on this process's scheduler. Processes without a scheduler skip it;
+    the scheduler process sees their write through its change check.
+    """
+    if SCHEDULER_ENABLED:
+        post_scheduler.notify(row_id, due_at)
+
+
+def claim_due_posts(platform_slots, limit):
+    """
+    Atomically lease up to `limit` due posts to this worker, at most
+    `platform_slots[platform]` per platform (the key None covers every platform not
+    listed), and return them as (id, video_id, platform, attempt_count), earliest
+    due first.
+
+    Due means: 'scheduled' past its time, 'retrying' past next_attempt_at, or
+    'posting' whose lease expired (its worker died mid-post). Rows missing those
+    times (left 'posting' by versions without leases, or set by hand) fall back to
+    schedule_time_utc, so they are retried instead of stuck. The claim runs in a
+    BEGIN IMMEDIATE transaction, so concurrent workers in other processes never
+    lease the same row; each claimed row gets locked_by = WORKER_ID and a
+    lease_expires_at that the lease renewer keeps pushing forward while posting.
+
+    attempt_count is incremented by the claim itself, so a post that takes its
+    worker down with it still uses up attempts and is eventually given up on.
+    The returned attempt_count is the value before this claim.
+    """
+    now = datetime.datetime.utcnow()
+    lease_expires_at = (now + datetime.timedelta(seconds=SCHEDULER_LEASE_SECONDS)).isoformat()
+    now = now.isoformat()
+    listed = [platform for platform in platform_slots if platform is not None]
+    # Each part of the UNION is an index search on status
+    query = """
+            SELECT id, video_id, platform, attempt_count, schedule_time_utc AS due_at
+            FROM scheduled_posts
+            WHERE status = 'scheduled'
+              AND schedule_time_utc <= ?{platform_filter}
+            UNION ALL
+            SELECT id, video_id, platform, attempt_count,
+                   COALESCE(next_attempt_at, schedule_time_utc) AS due_at
+            FROM scheduled_posts
+            WHERE status = 'retrying'
+              AND COALESCE(next_attempt_at, schedule_time_utc) <= ?{platform_filter}
+            UNION ALL
+            SELECT id, video_id, platform, attempt_count,
+                   COALESCE(lease_expires_at, schedule_time_utc) AS due_at
+            FROM scheduled_posts
+            WHERE status = 'posting'
+              AND COALESCE(lease_expires_at, schedule_time_utc) <= ?{platform_filter}
+            ORDER BY due_at ASC LIMIT ?
+            """
+    rows = []
+    with db.connection(DB_FILE) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for platform, slots in platform_slots.items():
+            if slots <= 0:
+                continue
+            if platform is not None:
+                platform_filter, platform_params = " AND platform = ?", [platform]
+            elif listed:
+                platform_filter = f" AND platform NOT IN ({', '.join('?' * len(listed))})"
+                platform_params = listed
+            else:
+                platform_filter, platform_params = "", []
+            params = ([now] + platform_params) * 3 + [min(slots, limit)]
+            rows.extend(conn.execute(query.format(platform_filter=platform_filter), params).fetchall())
+        rows = sorted(rows, key=lambda row: row['due_at'])[:limit]
+        for row in rows:
+            conn.execute("""
+                         UPDATE scheduled_posts
+                         SET status           = 'posting',
+                             last_result      = 'Posting started',
+                             attempt_count    = COALESCE(attempt_count, 0) + 1,
+                             locked_by        = ?,
+                             lease_expires_at = ?
+                         WHERE id = ?
+                         """, (WORKER_ID, lease_expires_at, row['id']))
+    rows = [(row['id'], row['video_id'], row['platform'], row['attempt_count'] or 0) for row in rows]
     if rows:
-        logger.info(f"Found {len(rows)} due scheduled posts")
+        logger.info(f"Claimed {len(rows)} due scheduled posts as {WORKER_ID}")
     return rows
 
 
+def renew_leases(row_ids):
+    """Extend this worker's leases on rows it is still posting."""
+    lease_expires_at = (datetime.datetime.utcnow() + datetime.timedelta(seconds=SCHEDULER_LEASE_SECONDS)).isoformat()
+    with db.connection(DB_FILE) as conn:
+        conn.executemany("""
+                         UPDATE scheduled_posts
+                         SET lease_expires_at = ?
+                         WHERE id = ?
+                           AND status = 'posting'
+                           AND locked_by = ?
+                         """, [(lease_expires_at, row_id, WORKER_ID) for row_id in row_ids])
+
+
+def release_lease(row_id):
+    lease_renewer.release(row_id)
+
+
 def local_datetime_string_to_utc(dt_local_str: str) -> datetime.datetime:
     try:
         logger.info(f"Parsing datetime string: {dt_local_str}")
@@ -774,74 +1073,198 @@ def local_datetime_string_to_utc(dt_local_str: str) -> datetime.datetime:
             raise ValueError(f"Invalid datetime format: {dt_local_str}. Expected format: YYYY-MM-DDTHH:MM")
 
 
-def scheduled_poster_worker(poll_interval_seconds=30):
-    logger.info(f"Scheduled poster worker started (poll interval: {poll_interval_seconds}s)")
-    while True:
-        try:
-            due_posts = get_due_scheduled_posts(limit=20)
-            logger.info(f"Checking due posts: {len(due_posts)} found")
+def process_scheduled_post(row):
+    row_id, video_id, platform, attempt_count = row
+    attempt = attempt_count + 1
+    logger.info(f"Processing scheduled post {row_id} for video {video_id} on {platform} (attempt {attempt})")
 
-            for row in due_posts:
-                row_id, video_id, platform = row
-                logger.info(f"Processing scheduled post {row_id} for video {video_id} on {platform}")
+    if attempt > SCHEDULER_MAX_ATTEMPTS:
+        # Only reachable by reclaiming expired leases: earlier attempts never recorded a result
+        record_post_result(row_id, {"success": False, "retryable": False,
+                                    "error": f"Worker lost the post during {attempt_count} attempts"},
+                           attempt, lease_owner=WORKER_ID)
+        return
 
-                try:
-                    update_scheduled_post_status(row_id, 'posting', last_result='Posting started')
-
-                    # Load video data from file
-                    current_video_data = load_video_data()
-                    video_info = current_video_data.get(video_id)
-
-                    if not video_info:
-                        error_msg = f'Missing video data for {video_id}'
-                        logger.error(error_msg)
-                        update_scheduled_post_status(row_id, 'failed', last_result=error_msg)
-                        continue
-
-                    summary = video_info['summaries'].get(platform)
-                    video_title = video_info['details']['title']
-                    video_details = video_info['details']
-                    thumbnail = video_details.get('thumbnail')
-
-                    logger.info(f"Posting to {platform}: {video_title}")
-
-                    if platform == "telegram":
-                        message = f"🎥 <b>{video_title}</b>\n\n{summary}\n\n#YouTube #Summary"
-                        result = post_to_telegram(message, photo_url=thumbnail)
-                    elif platform == "discord":
-                        if discord_configured:
-                            result = post_to_discord(summary, video_title, video_details)
-                        else:
-                            message = create_discord_message(summary, video_title, video_details)
-                            result = {"success": True, "message": "Discord message ready - copy/paste",
-                                      "discord_message": message}
-                    elif platform == "twitter":
-                        result = generate_twitter_post(summary, video_title, video_details, video_id)
-                    else:
-                        result = {"success": False, "error": "Unsupported platform"}
+    try:
+        # Point lookup through the shared in-process view
+        video_info = video_view.get(video_id)
 
-                    if result.get('success'):
-                        update_scheduled_post_status(row_id, 'posted', last_result=json.dumps(result), attempt_count=1)
-                        logger.info(f"Successfully posted scheduled post {row_id}")
-                    else:
-                        update_scheduled_post_status(row_id, 'failed', last_result=json.dumps(result), attempt_count=1)
-                        logger.error(f"Failed to post scheduled post {row_id}: {result.get('error')}")
+        if not video_info:
+            error_msg = f'Missing video data for {video_id}'
+            logger.error(error_msg)
+            record_post_result(row_id, {"success": False, "error": error_msg, "retryable": False}, attempt,
+                               lease_owner=WORKER_ID)
+            return
 
-                except Exception as e:
-                    error_msg = f"Error processing scheduled post: {str(e)}"
-                    logger.error(error_msg)
-                    update_scheduled_post_status(row_id, 'failed', last_result=error_msg)
+        summary = video_info['summaries'].get(platform)
+        video_title = video_info['details']['title']
+        video_details = video_info['details']
+        thumbnail = video_details.get('thumbnail')
 
-        except Exception as e:
-            logger.error(f"Scheduled poster worker exception: {e}")
+        logger.info(f"Posting to {platform}: {video_title}")
+
+        if platform == "telegram":
+            message = f"🎥 <b>{video_title}</b>\n\n{summary}\n\n#YouTube #Summary"
+            result = post_to_telegram(message, photo_url=thumbnail)
+        elif platform == "discord":
+            if discord_configured:
+                result = post_to_discord(summary, video_title, video_details)
+            else:
+                message = create_discord_message(summary, video_title, video_details)
+                result = {"success": True, "message": "Discord message ready - copy/paste",
+                          "discord_message": message}
+        elif platform == "twitter":
+            result = generate_twitter_post(summary, video_title, video_details, video_id)
+        else:
+            result = {"success": False, "error": "Unsupported platform", "retryable": False}
+
+        record_post_result(row_id, result, attempt, lease_owner=WORKER_ID)
+
+    except Exception as e:
+        error_msg = f"Error processing scheduled post: {str(e)}"
+        logger.error(error_msg)
+        record_post_result(row_id, {"success": False, "error": error_msg}, attempt, lease_owner=WORKER_ID)
 
-        time.sleep(poll_interval_seconds)
 
+def is_retryable(result):
+    """Rate limits, server errors and network failures are worth retrying; other API errors are not."""
+    if 'retryable' in result:
+        return result['retryable']
+    status_code = result.get('status_code')
+    return status_code is None or status_code == 429 or status_code >= 500
 
-# Start the scheduler thread
-scheduler_thread = threading.Thread(target=scheduled_poster_worker, daemon=True)
-scheduler_thread.start()
-logger.info("✅ Scheduler thread started and running")
+
+def retry_delay_seconds(attempt, retry_after=None):
+    """
+    Exponential backoff with jitter: base * 2^(attempt-1), capped, randomized over its upper half.
+    A server-provided retry_after is honored as a lower bound.
+    """
+    ceiling = min(SCHEDULER_RETRY_MAX_DELAY, SCHEDULER_RETRY_BASE_DELAY * (2 ** (attempt - 1)))
+    delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+    if retry_after:
+        delay = max(delay, float(retry_after))
+    return delay
+
+
+def record_post_result(row_id, result, attempt, lease_owner=None):
+    """
+    Store the outcome of one posting attempt: 'posted' on success, 'retrying' with a
+    backed-off next_attempt_at for transient failures, and 'dead' once the failure is
+    permanent or SCHEDULER_MAX_ATTEMPTS is reached. The scheduler passes its
+    `lease_owner` so nothing is written once another worker has reclaimed the row.
+    """
+    last_result = json.dumps(result)
+    if result.get('success'):
+        if update_scheduled_post_status(row_id, 'posted', last_result=last_result, attempt_count=attempt,
+                                        lease_owner=lease_owner):
+            logger.info(f"Successfully posted scheduled post {row_id}")
+    elif attempt < SCHEDULER_MAX_ATTEMPTS and is_retryable(result):
+        next_attempt = datetime.datetime.utcnow() + datetime.timedelta(
+            seconds=retry_delay_seconds(attempt, result.get('retry_after')))
+        if schedule_post_retry(row_id, last_result, attempt, next_attempt, lease_owner=lease_owner):
+            wake_scheduler(row_id, next_attempt)
+            logger.warning(f"Scheduled post {row_id} failed (attempt {attempt}), retrying at {next_attempt}: "
+                           f"{result.get('error')}")
+    else:
+        if update_scheduled_post_status(row_id, 'dead', last_result=last_result, attempt_count=attempt,
+                                        lease_owner=lease_owner):
+            logger.error(f"Scheduled post {row_id} is dead after {attempt} attempts: {result.get('error')}")
+
+
+def process_due_posts():
+    """
+    Lease as many due posts per platform as the dispatcher can start right away and
+    hand them to it. Leased rows are 'posting', so neither this nor any other worker
+    claims them again until the lease is released or expires; posts beyond this
+    process's capacity for their platform stay unclaimed for other workers. If any
+    platform's slots ran out, the next finished post pokes the scheduler to claim more.
+    """
+    slots = post_dispatcher.free_slots()
+    threads = post_dispatcher.free_threads()
+    due_posts = claim_due_posts(slots, threads) if threads and any(slots.values()) else []
+    claimed = {}
+    for row in due_posts:
+        platform = row[2] if row[2] in slots else None
+        claimed[platform] = claimed.get(platform, 0) + 1
+    if len(due_posts) >= threads or any(claimed.get(platform, 0) >= limit for platform, limit in slots.items()):
+        dispatch_backlog.set()
+    else:
+        dispatch_backlog.clear()
+    if not due_posts:
+        return
+    logger.info(f"Dispatching {len(due_posts)} due posts")
+    for row in due_posts:
+        lease_renewer.hold(row[0])
+        post_dispatcher.submit(row[2], row)
+
+
+def on_post_done():
+    if dispatch_backlog.is_set():
+        post_scheduler.poke()
+
+
+def get_upcoming_schedule_times(limit=1000):
+    """
+    (id, due time) of the next `limit` posts waiting for a first attempt, a retry, or
+    reclaim of an expired lease, for the scheduler heap.
+    """
+    with db.connection(DB_FILE) as conn:
+        rows = conn.execute("""
+                            SELECT id, schedule_time_utc AS due_at
+                            FROM scheduled_posts
+                            WHERE status = 'scheduled'
+                            UNION ALL
+                            SELECT id, COALESCE(next_attempt_at, schedule_time_utc) AS due_at
+                            FROM scheduled_posts
+                            WHERE status = 'retrying'
+                            UNION ALL
+                            SELECT id, COALESCE(lease_expires_at, schedule_time_utc) AS due_at
+                            FROM scheduled_posts
+                            WHERE status = 'posting'
+                            ORDER BY due_at ASC LIMIT ?
+                            """, (limit,)).fetchall()
+    return [(row['id'], row['due_at']) for row in rows if row['due_at']]
+
+
+# Retry policy for failed scheduled posts
+SCHEDULER_MAX_ATTEMPTS = int(os.getenv('SCHEDULER_MAX_ATTEMPTS', '5'))
+SCHEDULER_RETRY_BASE_DELAY = float(os.getenv('SCHEDULER_RETRY_BASE_DELAY', '30'))
+SCHEDULER_RETRY_MAX_DELAY = float(os.getenv('SCHEDULER_RETRY_MAX_DELAY', '3600'))
+
+# Row leasing: any number of processes can run the scheduler; each claims rows under its own id
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+SCHEDULER_LEASE_SECONDS = int(os.getenv('SCHEDULER_LEASE_SECONDS', '120'))
+lease_renewer = LeaseRenewer(renew_leases, interval_seconds=SCHEDULER_LEASE_SECONDS / 3)
+
+# Due posts go out concurrently, with a cap per platform. dispatch_backlog is set
+# while there may be due posts this process had no free slot for.
+dispatch_backlog = threading.Event()
+post_dispatcher = PostDispatcher(
+    process_scheduled_post,
+    max_workers=int(os.getenv('SCHEDULER_MAX_WORKERS', '8')),
+    platform_limits={
+        'telegram': int(os.getenv('SCHEDULER_TELEGRAM_CONCURRENCY', '3')),
+        'discord': int(os.getenv('SCHEDULER_DISCORD_CONCURRENCY', '3')),
+        'twitter': int(os.getenv('SCHEDULER_TWITTER_CONCURRENCY', '4')),
+    },
+    on_done=on_post_done
+)
+
+# Start the scheduler thread: sleeps until the next post is due, woken early by new schedules
+# from this process and, within SCHEDULER_CHANGE_POLL_SECONDS, by writes from other processes.
+# Set SCHEDULER_ENABLED=0 for processes that should only serve requests.
+SCHEDULER_ENABLED = os.getenv('SCHEDULER_ENABLED', '1') == '1'
+post_scheduler = PostScheduler(get_upcoming_schedule_times, process_due_posts,
+                               resync_seconds=int(os.getenv('SCHEDULER_RESYNC_SECONDS', '300')),
+                               changed=db.ChangeWatcher(DB_FILE).changed,
+                               poll_seconds=float(os.getenv('SCHEDULER_CHANGE_POLL_SECONDS', '2')))
+scheduler_thread = threading.Thread(target=post_scheduler.run, daemon=True)
+if SCHEDULER_ENABLED:
+    scheduler_thread.start()
+    lease_renewer.start()
+    logger.info(f"✅ Scheduler thread started and running (worker {WORKER_ID})")
+else:
+    logger.info("Scheduler disabled in this process (SCHEDULER_ENABLED=0)")
 
 
 
@@ -885,11 +1308,20 @@ except Exception as e:
     logger.warning(f'[WARNING] authlib not available: {e}')
     logger.exception(e)
 
+# Bounded worker pool for the long-running transcript pipeline
+job_queue = JobQueue(max_workers=int(os.getenv('TRANSCRIPT_WORKERS', '2')),
+                     max_pending=int(os.getenv('TRANSCRIPT_QUEUE_SIZE', '20')))
+
 # Move the add_flask_route import and call to AFTER all function definitions
 from ai_agent import add_flask_route
 
-add_flask_route(app, video_data, save_video_data, download_audio, transcribe_audio, summarize_text, get_video_details,
-                post_to_telegram, post_to_discord)
+add_flask_route(app, video_store, transcribe_video, summarize_text, get_video_details,
+                post_to_telegram, post_to_discord,
+                post_timeouts={
+                    'telegram': float(os.getenv('AGENT_TELEGRAM_TIMEOUT', '45')),
+                    'discord': float(os.getenv('AGENT_DISCORD_TIMEOUT', '45'))
+                },
+                video_id_from_url=youtube_video_id)
 
 
 @app.route("/", methods=["GET"])
@@ -982,7 +1414,7 @@ def auth_callback():
             userinfo_url = 'https://openidconnect.googleapis.com/v1/userinfo'
             headers = {'Authorization': f'Bearer {token.get("access_token")}'}
 
-            resp = requests.get(userinfo_url, headers=headers)
+            resp = http_client.get(userinfo_url, headers=headers)
             logger.info(f"[USERINFO] Status: {resp.status_code}")
 
             if resp.status_code == 200:
@@ -1015,14 +1447,14 @@ def auth_callback():
     logger.info(f"[SUCCESS] User logged in: {email}")
     # Update user DB with last_seen (helps compute active users for admin dashboard)
     try:
-        users = load_user_db()
-        users[email] = {
+        user_record = {
             'email': email,
             'name': user_info.get('name'),
             'picture': user_info.get('picture'),
             'last_seen': datetime.datetime.utcnow().isoformat()
         }
-        save_user_db(users)
+        # Mutate under the store lock so concurrent logins don't overwrite each other
+        user_store.update(lambda users: users.__setitem__(email, user_record))
     except Exception as e:
         logger.error(f"Error updating user_db after login: {e}")
     return redirect(url_for('index'))
@@ -1067,94 +1499,128 @@ def save_summary():
 
         if not video_id:
             return jsonify({'success': False, 'error': 'video_id is required'}), 400
-        if video_id not in video_data:
+        if video_id not in video_view:
             return jsonify({'success': False, 'error': 'video_id not found'}), 404
 
         user = session.get('user') or {}
         user_email = user.get('email', 'unknown')
 
-        saved = video_data[video_id].setdefault('saved_by', {})
-        user_list = saved.setdefault(user_email, [])
-        entry = {
-            'text': text,
-            'saved_at': datetime.datetime.utcnow().isoformat(),
-            'user': {'email': user.get('email'), 'name': user.get('name')}
-        }
-        user_list.append(entry)
-        video_data[video_id]['saved_by'] = saved
-        save_video_data(video_data)
+        saved_count = video_store.add_saved_summary(video_id, user_email, user.get('name'), text)
 
-        return jsonify({'success': True, 'message': 'Summary saved to your account', 'saved_count': len(user_list)})
+        return jsonify({'success': True, 'message': 'Summary saved to your account', 'saved_count': saved_count})
     except Exception as e:
         logger.error(f"Error saving summary: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def run_transcript_pipeline(url, set_stage):
+    """
+    Full /get_transcript pipeline, run on a job worker:
+    details -> download -> transcribe -> summarize -> save.
+    """
+    set_stage('fetching_details')
+    video_details = get_video_details(url)
+    if not video_details:
+        raise ValueError("Could not fetch video details.")
+
+    # Cached by canonical video id; downloads and transcribes only on a miss
+    transcript = transcribe_video(url, video_details, set_stage=set_stage)
+
+    # Generate summarized transcript (longer summary)
+    set_stage('summarizing')
+    summarized_transcript = summarize_text(transcript, max_length=300)
+
+    video_id = hashlib.md5(url.encode()).hexdigest()
+
+    # Update video data in the store
+    set_stage('saving')
+    video_store.put(video_id, {
+        'transcript': transcript,
+        'summarized_transcript': summarized_transcript,
+        'details': video_details
+    })
+
+    return {
+        "success": True,
+        "video_details": video_details,
+        "transcript": transcript,
+        "summarized_transcript": summarized_transcript,
+        "video_id": video_id
+    }
+
+
 @app.route("/get_transcript", methods=["POST"])
 def get_transcript():
+    """Queue the transcript pipeline and return a job id to poll at /job_status/<job_id>."""
     url = request.json.get("youtube_url")
     if not url:
         return jsonify({"error": "Please enter a valid URL."}), 400
     try:
-        video_details = get_video_details(url)
-        if not video_details:
-            return jsonify({"error": "Could not fetch video details."}), 400
-
-        # Download audio
-        audio_file = download_audio(url)
-
-        # Transcribe without chunking
-        transcript = transcribe_audio(audio_file)
-
-        # Generate summarized transcript (longer summary)
-        summarized_transcript = summarize_text(transcript, max_length=300)
+        job_id = job_queue.submit('transcript', run_transcript_pipeline, url)
+    except QueueFullError as e:
+        logger.warning(f"Rejecting transcript request: {e}")
+        return jsonify({"error": "Server is busy, please try again shortly."}), 503
 
-        video_id = hashlib.md5(url.encode()).hexdigest()
-
-        # Update video data and save to file
-        video_data[video_id] = {
-            'transcript': transcript,
-            'summarized_transcript': summarized_transcript,
-            'details': video_details
-        }
-        save_video_data(video_data)
-
-        # Clean up audio file
-        if os.path.exists(audio_file):
-            os.remove(audio_file)
-
-        return jsonify({
-            "success": True,
-            "video_details": video_details,
-            "transcript": transcript,
-            "summarized_transcript": summarized_transcript,
-            "video_id": video_id
-        })
-    except Exception as e:
-        logger.error(f"Error getting transcript: {e}")
-        print(traceback.format_exc())
-        return jsonify({"error": str(e)}), 500
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status_url": url_for('job_status', job_id=job_id)
+    }), 202
+
+
+@app.route("/job_status/<job_id>", methods=["GET"])
+def job_status(job_id):
+    """Poll a queued job; `result` holds the endpoint payload once status is 'succeeded'."""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"success": False, "error": f"Job {job_id} not found"}), 404
+    return jsonify({"success": True, "job": job})
+
+
+@app.route("/job_status/<job_id>/stream", methods=["GET"])
+def job_status_stream(job_id):
+    """Server-sent events stream of job snapshots until the job finishes."""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"success": False, "error": f"Job {job_id} not found"}), 404
+
+    def generate(job):
+        while True:
+            yield f"data: {json.dumps(job)}\n\n"
+            if job['status'] in FINISHED_STATES:
+                break
+            latest = job_queue.wait_for_change(job_id, job['version'])
+            if latest is None:
+                break
+            if latest['version'] == job['version']:
+                # Keep-alive comment so proxies don't close an idle stream
+                yield ": keep-alive\n\n"
+            job = latest
+
+    return Response(stream_with_context(generate(job)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @app.route("/get_summary", methods=["POST"])
 def get_summary():
     video_id = request.json.get("video_id")
-    if not video_id or video_id not in video_data:
+    video_info = video_view.get(video_id) if video_id else None
+    if not video_info:
         return jsonify({"error": "No transcript found. Please get transcript first."}), 400
 
-    transcript = video_data[video_id]['transcript']
-    video_title = video_data[video_id]['details']['title']
+    transcript = video_info['transcript']
+    video_title = video_info['details']['title']
 
-    # Generate platform-specific summaries
+    # Generate platform-specific summaries from a single chunking/summarization pass
+    by_length = summarize_text_multi(transcript, [100, 800, 1000])
     summaries = {
-        "twitter": summarize_text(transcript, max_length=100),
-        "telegram": summarize_text(transcript, max_length=800),
-        "discord": summarize_text(transcript, max_length=1000),
-        "full": video_data[video_id].get('summarized_transcript', '')  # Use the pre-generated full summary
+        "twitter": by_length[100],
+        "telegram": by_length[800],
+        "discord": by_length[1000],
+        "full": video_info.get('summarized_transcript', '')  # Use the pre-generated full summary
     }
 
-    video_data[video_id]['summaries'] = summaries
-    save_video_data(video_data)  # Save updated data with summaries
+    video_store.update_summaries(video_id, summaries)  # Save updated data with summaries
 
     return jsonify({
         "success": True,
@@ -1167,10 +1633,10 @@ def get_summary():
 def post_to_social():
     video_id = request.json.get("video_id")
     platform = request.json.get("platform")
-    if not video_id or video_id not in video_data:
+    video_info = video_view.get(video_id) if video_id else None
+    if not video_info:
         return jsonify({"error": "No video data found."}), 400
 
-    video_info = video_data[video_id]
     summary = video_info['summaries'].get(platform)
     video_title = video_info['details']['title']
     video_details = video_info['details']
@@ -1204,14 +1670,14 @@ def schedule_post():
 
     logger.info(f"Scheduling post - Video: {video_id}, Platform: {platform}, Time: {schedule_time}")
 
-    if not video_id or video_id not in video_data:
+    video_info = video_view.get(video_id) if video_id else None
+    if not video_info:
         return jsonify({"error": "No video data found."}), 400
     if not platform:
         return jsonify({"error": "Platform missing."}), 400
 
     if post_now_flag or not schedule_time:
         # Immediate posting
-        video_info = video_data[video_id]
         summary = video_info['summaries'].get(platform)
         video_title = video_info['details']['title']
         video_details = video_info['details']
@@ -1321,15 +1787,12 @@ def custom_tweet():
 @app.route("/debug_schedules", methods=["GET"])
 def debug_schedules():
     """Debug endpoint to check scheduled posts"""
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    c.execute("""
-              SELECT id, video_id, platform, schedule_time_utc, status, created_at
-              FROM scheduled_posts
-              ORDER BY schedule_time_utc DESC LIMIT 10
-              """)
-    rows = c.fetchall()
-    conn.close()
+    with db.connection(DB_FILE) as conn:
+        rows = conn.execute("""
+                            SELECT id, video_id, platform, schedule_time_utc, status, created_at
+                            FROM scheduled_posts
+                            ORDER BY schedule_time_utc DESC LIMIT 10
+                            """).fetchall()
 
     schedules = []
     for row in rows:
@@ -1345,19 +1808,45 @@ def debug_schedules():
     return jsonify({
         'current_time_utc': datetime.datetime.utcnow().isoformat(),
         'schedules': schedules,
-        'video_data_keys': list(video_data.keys())
+        'video_data_keys': video_store.keys()
     })
 
 
 @app.route("/health", methods=["GET"])
 def health_check():
+    """Liveness only: answers as soon as the process is up, whether or not models are loaded."""
     return jsonify({
         "status": "healthy",
         "timestamp": datetime.datetime.utcnow().isoformat(),
-        "scheduler_alive": scheduler_thread.is_alive()
+        "scheduler_alive": scheduler_thread.is_alive(),
+        "scheduler_enabled": SCHEDULER_ENABLED,
+        "scheduler_next_due_utc": post_scheduler.next_due() if SCHEDULER_ENABLED else None
     })
 
 
+def inference_server_stats():
+    if not inference_client:
+        return None
+    try:
+        return dict(inference_client.call('stats'), address=INFERENCE_SERVER_ADDRESS)
+    except Exception as e:
+        return {"address": INFERENCE_SERVER_ADDRESS, "error": str(e)}
+
+
+@app.route("/ready")
+def readiness_check():
+    """Readiness: 200 once the warm-up models are loaded, 503 while they are loading or if loading failed."""
+    ready = models.ready(WARMUP_MODELS)
+    if not ready:
+        # Retry models that failed (e.g. the inference server wasn't up yet)
+        models.warm_up(WARMUP_MODELS)
+    return jsonify({
+        "ready": ready,
+        "models": models.status(),
+        "timestamp": datetime.datetime.utcnow().isoformat()
+    }), 200 if ready else 503
+
+
 # -------------------------------
 # Admin Routes
 # -------------------------------
@@ -1371,22 +1860,20 @@ def admin():
 def admin_scheduled_posts():
     """API endpoint to get all scheduled posts"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("""
-                  SELECT id,
-                         video_id,
-                         platform,
-                         schedule_time_utc,
-                         status,
-                         attempt_count,
-                         last_result,
-                         created_at
-                  FROM scheduled_posts
-                  ORDER BY schedule_time_utc DESC
-                  """)
-        rows = c.fetchall()
-        conn.close()
+        with db.connection(DB_FILE) as conn:
+            rows = conn.execute("""
+                                SELECT id,
+                                       video_id,
+                                       platform,
+                                       schedule_time_utc,
+                                       status,
+                                       attempt_count,
+                                       last_result,
+                                       created_at,
+                                       next_attempt_at
+                                FROM scheduled_posts
+                                ORDER BY schedule_time_utc DESC
+                                """).fetchall()
 
         posts = []
         for row in rows:
@@ -1398,7 +1885,8 @@ def admin_scheduled_posts():
                 'status': row[4],
                 'attempt_count': row[5],
                 'last_result': row[6],
-                'created_at': row[7]
+                'created_at': row[7],
+                'next_attempt_at': row[8]
             })
 
         return jsonify({"success": True, "posts": posts})
@@ -1411,8 +1899,7 @@ def admin_scheduled_posts():
 def admin_video_data():
     """API endpoint to get all video data"""
     try:
-        video_data = load_video_data()
-        return jsonify({"success": True, "video_data": video_data})
+        return jsonify({"success": True, "video_data": video_store.all()})
     except Exception as e:
         logger.error(f"Error fetching video data: {e}")
         return jsonify({"success": False, "error": str(e)})
@@ -1422,26 +1909,21 @@ def admin_video_data():
 def admin_system_status():
     """API endpoint to get system status"""
     try:
-        # Database status
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-
-        # Count scheduled posts by status
-        c.execute("""
-                  SELECT status, COUNT(*) as count
-                  FROM scheduled_posts
-                  GROUP BY status
-                  """)
-        status_counts = dict(c.fetchall())
+        # Database status: count scheduled posts by status
+        with db.connection(DB_FILE) as conn:
+            rows = conn.execute("""
+                                SELECT status, COUNT(*) as count
+                                FROM scheduled_posts
+                                GROUP BY status
+                                """).fetchall()
+        status_counts = {row['status']: row['count'] for row in rows}
 
         # Total videos processed
-        video_count = len(video_data)
+        video_count = len(video_store)
 
         # Scheduler status
         scheduler_alive = scheduler_thread.is_alive()
 
-        conn.close()
-
         return jsonify({
             "success": True,
             "system_status": {
@@ -1450,7 +1932,21 @@ def admin_system_status():
                 "post_status_counts": status_counts,
                 "current_time_utc": datetime.datetime.utcnow().isoformat(),
                 "database_file": DB_FILE,
-                "video_data_file": VIDEO_DATA_FILE
+                "video_data_file": VIDEO_DB_FILE,
+                "jobs": job_queue.stats(),
+                "summary_cache": summary_cache.stats(),
+                "video_view": video_view.stats(),
+                "db_pools": db.pool_stats(),
+                "http_pools": http_client.pool_stats(),
+                "rate_limits": rate_limiter.stats(),
+                "transcriber": describe_transcriber(get_transcriber()) if models.is_loaded('transcriber') else None,
+                "models": models.status(),
+                "inference_server": inference_server_stats(),
+                "summary_batcher": get_summarizer().batcher.stats()
+                if not inference_client and models.is_loaded('summarizer') else None,
+                "post_dispatcher": post_dispatcher.stats(),
+                "scheduler_worker_id": WORKER_ID,
+                "leases_held": lease_renewer.held()
             }
         })
     except Exception as e:
@@ -1462,12 +1958,8 @@ def admin_system_status():
 def delete_scheduled_post(post_id):
     """Delete a scheduled post"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("DELETE FROM scheduled_posts WHERE id = ?", (post_id,))
-        conn.commit()
-        deleted = c.rowcount > 0
-        conn.close()
+        with db.connection(DB_FILE) as conn:
+            deleted = conn.execute("DELETE FROM scheduled_posts WHERE id = ?", (post_id,)).rowcount > 0
 
         if deleted:
             logger.info(f"Deleted scheduled post {post_id}")
@@ -1598,6 +2090,9 @@ def delete_scheduled_post(post_id):
             return jsonify({'success': False, 'error': str(e)}), 500
 
 
+ADMIN_POST_STATUSES = ('scheduled', 'posted', 'failed', 'dead')
+
+
 @app.route("/admin/api/update_post_status", methods=["POST"])
 def update_post_status():
     """Update post status manually"""
@@ -1608,8 +2103,15 @@ def update_post_status():
 
         if not post_id or not status:
             return jsonify({"success": False, "error": "Missing post_id or status"})
+        # 'posting' and 'retrying' belong to the scheduler: they need a lease or a retry time
+        if status not in ADMIN_POST_STATUSES:
+            return jsonify({"success": False,
+                            "error": f"Status must be one of: {', '.join(ADMIN_POST_STATUSES)}"})
 
         update_scheduled_post_status(post_id, status, "Manually updated by admin")
+        if status == 'scheduled' and SCHEDULER_ENABLED:
+            # Re-queued by hand: rebuild the scheduler heap so the post fires on time
+            post_scheduler.resync()
 
         return jsonify({"success": True, "message": f"Post {post_id} status updated to {status}"})
     except Exception as e:
@@ -1617,13 +2119,53 @@ def update_post_status():
         return jsonify({"success": False, "error": str(e)})
 
 
+@app.route("/admin/api/dead_posts")
+def admin_dead_posts():
+    """List scheduled posts that exhausted their retries (status 'dead')"""
+    try:
+        with db.connection(DB_FILE) as conn:
+            rows = conn.execute("""
+                                SELECT id, video_id, platform, schedule_time_utc, attempt_count, last_result, created_at
+                                FROM scheduled_posts
+                                WHERE status = 'dead'
+                                ORDER BY schedule_time_utc DESC
+                                """).fetchall()
+        return jsonify({"success": True, "posts": [dict(row) for row in rows]})
+    except Exception as e:
+        logger.error(f"Error fetching dead posts: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
+@app.route("/admin/api/requeue_post/<int:post_id>", methods=["POST"])
+def requeue_post(post_id):
+    """Re-queue a dead or failed post with a fresh attempt budget"""
+    try:
+        if requeue_scheduled_post(post_id):
+            return jsonify({"success": True, "message": f"Post {post_id} re-queued"})
+        return jsonify({"success": False, "error": f"Post {post_id} not found or not dead/failed"})
+    except Exception as e:
+        logger.error(f"Error re-queuing post {post_id}: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
+@app.route("/admin/api/requeue_dead_posts", methods=["POST"])
+def requeue_dead_posts():
+    """Re-queue every dead post"""
+    try:
+        with db.connection(DB_FILE) as conn:
+            post_ids = [row['id'] for row in conn.execute("SELECT id FROM scheduled_posts WHERE status = 'dead'")]
+        requeued = sum(1 for post_id in post_ids if requeue_scheduled_post(post_id))
+        return jsonify({"success": True, "message": f"Re-queued {requeued} dead posts", "requeued": requeued})
+    except Exception as e:
+        logger.error(f"Error re-queuing dead posts: {e}")
+        return jsonify({"success": False, "error": str(e)})
+
+
 @app.route("/admin/api/delete_video/<video_id>", methods=["DELETE"])
 def delete_video(video_id):
     """Delete video data"""
     try:
-        if video_id in video_data:
-            del video_data[video_id]
-            save_video_data(video_data)
+        if video_store.delete(video_id):
             logger.info(f"Deleted video data for {video_id}")
             return jsonify({"success": True, "message": f"Video {video_id} deleted successfully"})
         else:
@@ -1637,20 +2179,18 @@ def delete_video(video_id):
 def run_post_now(post_id):
     """Run a scheduled post immediately"""
     try:
-        conn = sqlite3.connect(DB_FILE)
-        c = conn.cursor()
-        c.execute("SELECT video_id, platform FROM scheduled_posts WHERE id = ?", (post_id,))
-        row = c.fetchone()
-        conn.close()
+        with db.connection(DB_FILE) as conn:
+            row = conn.execute("SELECT video_id, platform, attempt_count FROM scheduled_posts WHERE id = ?",
+                               (post_id,)).fetchone()
 
         if not row:
             return jsonify({"success": False, "error": f"Post {post_id} not found"})
 
-        video_id, platform = row
+        video_id, platform, attempt_count = row
+        attempt = (attempt_count or 0) + 1
 
         # Load video data
-        current_video_data = load_video_data()
-        video_info = current_video_data.get(video_id)
+        video_info = video_view.get(video_id)
 
         if not video_info:
             return jsonify({"success": False, "error": f"Video data for {video_id} not found"})
@@ -1674,12 +2214,11 @@ def run_post_now(post_id):
         else:
             result = {"success": False, "error": "Unsupported platform"}
 
-        # Update status
+        # Update status (failures go through the same retry / dead-letter policy as the scheduler)
+        record_post_result(post_id, result, attempt)
         if result.get('success'):
-            update_scheduled_post_status(post_id, 'posted', last_result=json.dumps(result), attempt_count=1)
             return jsonify({"success": True, "message": f"Post {post_id} executed successfully"})
         else:
-            update_scheduled_post_status(post_id, 'failed', last_result=json.dumps(result), attempt_count=1)
             return jsonify({"success": False, "error": result.get('error', 'Unknown error')})
 
     except Exception as e:
@@ -1687,6 +2226,11 @@ def run_post_now(post_id):
         return jsonify({"success": False, "error": str(e)})
 
 
+# Load models in the background so the server answers /health right away. The Werkzeug
+# reloader's parent process never serves requests, so it doesn't load them.
+if WARMUP_MODELS and (__name__ != "__main__" or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+    models.warm_up(WARMUP_MODELS)
+
 # -------------------------------
 # Main execution
 # -------------------------------
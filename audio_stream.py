@@ -0,0 +1,80 @@
+import subprocess
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Both whisper backends take 16 kHz mono float32 samples directly
+SAMPLE_RATE = 16000
+
+# Stream protocols ffmpeg can read from a single URL; DASH segment lists can't be
+STREAMABLE_PROTOCOLS = ('http', 'https', 'm3u8', 'm3u8_native')
+
+# Give up on a stalled connection after this many seconds without data
+READ_TIMEOUT_SECONDS = 30
+
+
+class AudioStreamError(Exception):
+    """The audio stream could not be resolved or decoded; callers fall back to downloading a file."""
+
+
+def resolve_audio_stream(url):
+    """Direct URL, HTTP headers and duration of the best audio format, without downloading it."""
+    import yt_dlp
+
+    ydl_opts = {'format': 'bestaudio/best', 'quiet': True, 'no_warnings': True}
+    try:
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+    except Exception as e:
+        raise AudioStreamError(f"Could not resolve audio stream: {e}") from e
+    stream_url = info.get('url')
+    protocol = info.get('protocol') or 'https'
+    if not stream_url or protocol not in STREAMABLE_PROTOCOLS:
+        raise AudioStreamError(f"Format {info.get('format_id')} ({protocol}) can't be streamed")
+    return {'url': stream_url, 'headers': info.get('http_headers') or {}, 'duration': info.get('duration')}
+
+
+def decode_stream(stream, sample_rate=SAMPLE_RATE):
+    """
+    Have ffmpeg read the remote stream and decode it straight to mono 16-bit PCM
+    on a pipe, returned as float32 samples in [-1, 1) (what whisper's own
+    load_audio produces from a file). Nothing is written to disk.
+    """
+    import numpy as np
+
+    command = ['ffmpeg', '-nostdin', '-hide_banner', '-loglevel', 'error',
+               '-rw_timeout', str(READ_TIMEOUT_SECONDS * 1000000)]
+    if stream['url'].startswith('http'):
+        command += ['-reconnect', '1', '-reconnect_streamed', '1', '-reconnect_delay_max', '5']
+    if stream['headers']:
+        command += ['-headers', ''.join(f"{name}: {value}\r\n" for name, value in stream['headers'].items())]
+    command += ['-i', stream['url'], '-vn', '-f', 's16le', '-acodec', 'pcm_s16le',
+                '-ac', '1', '-ar', str(sample_rate), '-']
+    try:
+        process = subprocess.run(command, capture_output=True)
+    except OSError as e:
+        raise AudioStreamError(f"Could not run ffmpeg: {e}") from e
+    if process.returncode != 0 or not process.stdout:
+        error = process.stderr.decode(errors='replace').strip()[-500:]
+        raise AudioStreamError(f"ffmpeg could not decode the audio stream: {error or 'no audio'}")
+    return np.frombuffer(process.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def load_audio(url):
+    """16 kHz mono float32 samples for a video URL, decoded from the stream as it downloads."""
+    stream = resolve_audio_stream(url)
+    samples = decode_stream(stream)
+    logger.info(f"Decoded {len(samples) / SAMPLE_RATE:.0f}s of audio from the stream")
+    return samples
+
+
+def write_wav(samples, path, sample_rate=SAMPLE_RATE):
+    """Write float32 samples as 16-bit mono WAV (a copy of the PCM, no encoding)."""
+    import wave
+    import numpy as np
+
+    with wave.open(path, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((np.clip(samples, -1.0, 1.0 - 1 / 32768) * 32768).astype(np.int16).tobytes())
@@ -0,0 +1,124 @@
+import time
+import threading
+import logging
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects work from concurrent callers into batches.
+
+    `submit(items, key)` queues a list of items and returns a Future for their
+    outputs. A single worker thread takes the oldest job, waits up to `max_wait`
+    seconds for more jobs with an equal `key`, and calls `run_batch(items, key)`
+    once for up to `max_batch` items, then routes each slice of the outputs back
+    to its caller. If a merged batch fails, its jobs are rerun one by one so one
+    bad input only fails its own caller.
+    """
+
+    def __init__(self, run_batch, max_batch=8, max_wait=0.01, name='micro-batcher'):
+        self.run_batch = run_batch
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._pending = []
+        self._cond = threading.Condition()
+        self.batches = 0
+        self.items = 0
+        self.merged_jobs = 0
+        threading.Thread(target=self._run, daemon=True, name=name).start()
+
+    def submit(self, items, key=None):
+        future = Future()
+        with self._cond:
+            self._pending.append((list(items), key, future))
+            self._cond.notify()
+        return future
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            key = self._pending[0][1]
+            deadline = time.monotonic() + self.max_wait
+            while True:
+                same = [job for job in self._pending if job[1] == key]
+                remaining = deadline - time.monotonic()
+                if sum(len(job[0]) for job in same) >= self.max_batch or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, size = [], 0
+            for job in same:
+                if batch and size + len(job[0]) > self.max_batch:
+                    break
+                batch.append(job)
+                size += len(job[0])
+            for job in batch:
+                self._pending.remove(job)
+            return batch, key
+
+    def _run_jobs(self, batch, key):
+        items = [item for job in batch for item in job[0]]
+        outputs = self.run_batch(items, key)
+        start = 0
+        for job in batch:
+            job[2].set_result(outputs[start:start + len(job[0])])
+            start += len(job[0])
+        self.batches += 1
+        self.items += len(items)
+        if len(batch) > 1:
+            self.merged_jobs += len(batch)
+
+    def _run(self):
+        while True:
+            batch, key = self._take_batch()
+            try:
+                self._run_jobs(batch, key)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][2].set_exception(e)
+                    continue
+                logger.warning(f"Batch of {len(batch)} jobs failed, running them separately: {e}")
+                for job in batch:
+                    try:
+                        self._run_jobs([job], key)
+                    except Exception as job_error:
+                        job[2].set_exception(job_error)
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            'pending_jobs': pending,
+            'batches': self.batches,
+            'items': self.items,
+            'merged_jobs': self.merged_jobs,
+            'mean_batch_size': round(self.items / self.batches, 2) if self.batches else None,
+            'max_batch': self.max_batch,
+            'max_wait_ms': round(self.max_wait * 1000, 1)
+        }
+
+
+class BatchedPipeline:
+    """
+    Drop-in wrapper for a transformers summarization pipeline that batches calls
+    across threads. Calls take and return the same shapes as the pipeline (a list
+    of {'summary_text': ...} per input); calls with identical generation
+    parameters are merged into one padded forward pass.
+    """
+
+    def __init__(self, pipeline, max_batch=8, max_wait=0.01):
+        self.pipeline = pipeline
+        self.tokenizer = getattr(pipeline, 'tokenizer', None)
+        self.batcher = MicroBatcher(self._run_batch, max_batch, max_wait, name='summary-batcher')
+
+    def _run_batch(self, inputs, generation_kwargs):
+        return self.pipeline(inputs, batch_size=len(inputs), **dict(generation_kwargs))
+
+    def __call__(self, inputs, **generation_kwargs):
+        # The batcher picks the batch size across all callers
+        generation_kwargs.pop('batch_size', None)
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+        # Sorted items make the merge key independent of keyword order
+        return self.batcher.submit(inputs, tuple(sorted(generation_kwargs.items()))).result()
@@ -0,0 +1,164 @@
+"""
+Compare summarization engines (pytorch, int8, onnx) on latency and output quality.
+
+Runs every engine over the same transcripts through the app's own chunked
+summarization path (chunking, batched chunk summaries, final pass), timed as
+the app calls it per video: the full summary when a transcript is processed,
+and the three platform summaries in one shared pass for /get_summary. Reports
+latency per engine and call, plus ROUGE-L agreement with the pytorch engine's
+output per summary.
+
+    python benchmark_summarization.py --engines pytorch,int8,onnx --samples 5
+    python benchmark_summarization.py --text-file talk.txt --json results.json
+"""
+import os
+import json
+import time
+import argparse
+import statistics
+
+from summarization_engines import ENGINES, build_summarization_pipeline
+from summarization import generate_summary, generate_summaries
+
+# max_length of each stored summary, as the app requests them
+PLATFORM_LENGTHS = {'full': 300, 'twitter': 100, 'telegram': 800, 'discord': 1000}
+
+# One app call per video each: run_transcript_pipeline's full summary, and
+# /get_summary's platform summaries from a single chunking pass
+CALLS = {'full_summary': ['full'], 'get_summary': ['twitter', 'telegram', 'discord']}
+
+
+def rouge_l(candidate, reference):
+    """ROUGE-L F1 over lowercase words (longest common subsequence)."""
+    a, b = candidate.lower().split(), reference.lower().split()
+    if not a or not b:
+        return 0.0
+    previous = [0] * (len(b) + 1)
+    for word in a:
+        current = [0]
+        for j, other in enumerate(b):
+            current.append(previous[j] + 1 if word == other else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if lcs == 0:
+        return 0.0
+    precision, recall = lcs / len(a), lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def load_texts(args):
+    if args.text_file:
+        texts = []
+        for path in args.text_file:
+            with open(path) as f:
+                texts.append(f.read())
+        return texts
+    from video_store import VideoStore
+
+    store = VideoStore(args.db)
+    texts = [video['transcript'] for video in store.all().values() if len(video.get('transcript') or '') >= 100]
+    return texts[:args.samples]
+
+
+def run_call(summarizer, text, platforms):
+    if platforms == ['full']:
+        return {'full': generate_summary(summarizer, text, PLATFORM_LENGTHS['full'])}
+    by_length = generate_summaries(summarizer, text, [PLATFORM_LENGTHS[platform] for platform in platforms])
+    return {platform: by_length[PLATFORM_LENGTHS[platform]] for platform in platforms}
+
+
+def run_engine(engine, model_name, texts, device, repeats):
+    started = time.perf_counter()
+    summarizer = build_summarization_pipeline(model_name, engine, device)
+    load_seconds = time.perf_counter() - started
+
+    # Warm-up call so one-time graph/kernel setup isn't counted as latency
+    summarizer(texts[0][:2000], max_length=100, min_length=30, do_sample=False, truncation=True)
+
+    timings = {call: [] for call in CALLS}
+    outputs = {platform: [] for platform in PLATFORM_LENGTHS}
+    for text in texts:
+        for call, platforms in CALLS.items():
+            for _ in range(repeats):
+                started = time.perf_counter()
+                summaries = run_call(summarizer, text, platforms)
+                timings[call].append(time.perf_counter() - started)
+            for platform, summary in summaries.items():
+                outputs[platform].append(summary)
+    return load_seconds, timings, outputs
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--engines', default=','.join(ENGINES), help="comma-separated engines to compare")
+    parser.add_argument('--model', default=os.getenv('SUMMARIZATION_MODEL', 'facebook/bart-large-cnn'))
+    parser.add_argument('--db', default=os.getenv('VIDEO_DB_FILE', 'video_data.db'),
+                        help="video store to take transcripts from")
+    parser.add_argument('--text-file', action='append', help="transcript file to use instead of the video store")
+    parser.add_argument('--samples', type=int, default=5, help="transcripts taken from the video store")
+    parser.add_argument('--repeats', type=int, default=1, help="timed runs per transcript and call")
+    parser.add_argument('--device', default=os.getenv('MODEL_DEVICE', 'cpu'))
+    parser.add_argument('--json', help="also write raw results to this file")
+    args = parser.parse_args()
+
+    texts = [text.replace('\n', ' ').strip() for text in load_texts(args)]
+    if not texts:
+        parser.error("no transcripts found; pass --text-file or point --db at a populated video store")
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+    # pytorch runs first: it is the quality reference for the others
+    engines.sort(key=lambda engine: engine != 'pytorch')
+
+    report = {}
+    for engine in engines:
+        print(f"Running {engine} on {len(texts)} transcripts...")
+        try:
+            load_seconds, timings, outputs = run_engine(engine, args.model, texts, args.device, args.repeats)
+        except Exception as e:
+            print(f"  {engine} unavailable: {e}")
+            continue
+        report[engine] = {'load_seconds': round(load_seconds, 2),
+                          'calls': {call: {'timings': t} for call, t in timings.items()},
+                          'platforms': {platform: {'outputs': o} for platform, o in outputs.items()}}
+
+    reference = report.get('pytorch')
+    print()
+    print(f"{'engine':<8} {'call':<13} {'mean s':>8} {'p95 s':>8} {'speedup':>8}")
+    for engine, engine_report in report.items():
+        for call, result in engine_report['calls'].items():
+            mean = statistics.mean(result['timings'])
+            result['mean_seconds'] = round(mean, 3)
+            result['p95_seconds'] = round(percentile(result['timings'], 0.95), 3)
+            speedup = None
+            if reference and engine != 'pytorch':
+                speedup = statistics.mean(reference['calls'][call]['timings']) / mean
+            result['speedup'] = round(speedup, 2) if speedup else None
+            print(f"{engine:<8} {call:<13} {mean:>8.2f} {result['p95_seconds']:>8.2f} "
+                  f"{(f'{speedup:.2f}x' if speedup else '-'):>8}")
+        print(f"{engine:<8} load time {engine_report['load_seconds']}s")
+
+    print()
+    print(f"{'engine':<8} {'summary':<9} {'rougeL':>7} {'words':>6}")
+    for engine, engine_report in report.items():
+        for platform, result in engine_report['platforms'].items():
+            result['mean_words'] = round(statistics.mean(len(o.split()) for o in result['outputs']), 1)
+            rouge = None
+            if reference and engine != 'pytorch':
+                rouge = statistics.mean(rouge_l(candidate, ref) for candidate, ref
+                                        in zip(result['outputs'], reference['platforms'][platform]['outputs']))
+            result['rouge_l_vs_pytorch'] = round(rouge, 3) if rouge is not None else None
+            print(f"{engine:<8} {platform:<9} {(f'{rouge:.3f}' if rouge is not None else '-'):>7} "
+                  f"{result['mean_words']:>6}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Raw results written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+MAX_IDLE_CONNECTIONS = int(os.getenv('SQLITE_MAX_IDLE_CONNECTIONS', '8'))
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """
+    Pool of SQLite connections to one database file.
+
+    Connections are opened in WAL mode with a busy timeout, so readers (admin
+    dashboard) never block the writer (scheduler) and writers wait for each other
+    instead of failing with "database is locked". Each connection keeps sqlite3's
+    prepared-statement cache, so reusing a connection reuses compiled statements.
+
+    `connection()` hands the calling thread a connection for the duration of the
+    `with` block (re-entrant within a thread) and commits when the outermost block
+    exits, rolling back on error.
+    """
+
+    def __init__(self, db_file, max_idle=MAX_IDLE_CONNECTIONS, busy_timeout_ms=BUSY_TIMEOUT_MS):
+        self.db_file = db_file
+        self.max_idle = max_idle
+        self.busy_timeout_ms = busy_timeout_ms
+        self._idle = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.opened = 0
+        self.reused = 0
+        self.in_use = 0
+
+    def _open(self):
+        conn = sqlite3.connect(self.db_file, timeout=self.busy_timeout_ms / 1000,
+                               check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    def _acquire(self):
+        with self._lock:
+            self.in_use += 1
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+            self.opened += 1
+        return self._open()
+
+    def _release(self, conn):
+        with self._lock:
+            self.in_use -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        held = getattr(self._local, 'conn', None)
+        if held is not None:
+            # Nested use in the same thread shares the outer transaction
+            yield held
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.conn = None
+            self._release(conn)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'db_file': self.db_file,
+                'opened': self.opened,
+                'reused': self.reused,
+                'in_use': self.in_use,
+                'idle': len(self._idle)
+            }
+
+
+class ChangeWatcher:
+    """
+    Cheap check for writes committed to `db_file` by any other connection, in this
+    process or another. PRAGMA data_version is per connection, so the watcher keeps
+    its own; use it from one thread only.
+    """
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        self._conn = None
+        self._version = None
+
+    def changed(self):
+        """True if anything was committed since the previous call (False on the first)."""
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = self._version is not None and version != self._version
+        self._version = version
+        return changed
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_file):
+    """Return the process-wide pool for `db_file`, creating it on first use."""
+    key = os.path.abspath(db_file)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_file)
+            logger.info(f"Opened SQLite connection pool for {db_file} (WAL, busy timeout {BUSY_TIMEOUT_MS}ms)")
+        return pool
+
+
+def connection(db_file):
+    """Shortcut for `get_pool(db_file).connection()`."""
+    return get_pool(db_file).connection()
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+def migrate(db_file, migrations):
+    """
+    Apply versioned schema migrations to `db_file`.
+
+    `migrations` is an ordered list of (version, description, statements) where
+    statements is a list of SQL strings. The applied version is tracked in
+    PRAGMA user_version; each pending migration runs in its own transaction.
+    Returns the schema version after migrating.
+    """
+    with connection(db_file) as conn:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+
+    for version, description, statements in migrations:
+        if version <= current:
+            continue
+        with connection(db_file) as conn:
+            # Explicit write transaction: sqlite3 doesn't open one for DDL, and another
+            # process may be migrating the same file concurrently
+            conn.execute("BEGIN IMMEDIATE")
+            current = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version <= current:
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            # PRAGMA doesn't accept bound parameters; version is an int from our own list
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+        logger.info(f"Applied {db_file} migration {version}: {description}")
+        current = version
+    return current
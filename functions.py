@@ -1,9 +1,6 @@
 import os
 from dotenv import load_dotenv
 import yt_dlp
-import whisper
-from transformers import pipeline, BartForConditionalGeneration, BartTokenizer
-import torch
 import requests
 import json
 import datetime
@@ -13,6 +10,7 @@ import time
 from typing import Optional
 import logging
 import urllib.parse
+from models import ModelRegistry
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -81,32 +79,41 @@ def check_environment():
 check_environment()
 
 # -------------------------------
-# Device setup
+# Models (loaded on first use, not at import)
 # -------------------------------
-device = "cuda" if torch.cuda.is_available() else "cpu"
-print("Using device:", device)
+def load_whisper():
+    import torch
+    import whisper
 
-# -------------------------------
-# Load models
-# -------------------------------
-model = whisper.load_model("base")
-
-# Load a better summarization model
-try:
-    # Try to use BART model for better summarization
-    summarization_model_name = "facebook/bart-large-cnn"
-    summarizer = pipeline(
-        "summarization",
-        model=summarization_model_name,
-        tokenizer=summarization_model_name,
-        device=0 if device == "cuda" else -1
-    )
-    print("✅ Using BART model for summarization")
-except Exception as e:
-    print(f"⚠️  Could not load BART model, using default: {e}")
-    summarizer = pipeline("summarization", device=0 if device == "cuda" else -1)
-
-print("✅ Models loaded: Whisper (transcription) and Transformers (summarization)")
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    print("Using device:", device)
+    return whisper.load_model("base", device=device)
+
+
+def load_summarizer():
+    import torch
+    from transformers import pipeline
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    try:
+        # Try to use BART model for better summarization
+        summarization_model_name = "facebook/bart-large-cnn"
+        summarizer = pipeline(
+            "summarization",
+            model=summarization_model_name,
+            tokenizer=summarization_model_name,
+            device=0 if device == "cuda" else -1
+        )
+        print("✅ Using BART model for summarization")
+    except Exception as e:
+        print(f"⚠️  Could not load BART model, using default: {e}")
+        summarizer = pipeline("summarization", device=0 if device == "cuda" else -1)
+    return summarizer
+
+
+models = ModelRegistry()
+models.register('whisper', load_whisper)
+models.register('summarizer', load_summarizer)
 
 
 # -------------------------------
@@ -142,7 +149,7 @@ def transcribe_audio(file_path):
     """
     try:
         print(f"Transcribing audio file: {file_path}")
-        result = model.transcribe(file_path)
+        result = models.get('whisper').transcribe(file_path)
         transcript = result['text'].strip()
         print(f"Transcription completed. Length: {len(transcript)} characters")
         return transcript
@@ -188,7 +195,7 @@ def summarize_text(text, max_length=150):
 
         # If text is short, summarize directly
         if len(text) < 800:
-            summary = summarizer(
+            summary = models.get('summarizer')(
                 text,
                 max_length=max_length,
                 min_length=max(30, max_length // 3),
@@ -202,7 +209,7 @@ def summarize_text(text, max_length=150):
 
         if len(chunks) == 1:
             # Single chunk - summarize directly
-            summary = summarizer(
+            summary = models.get('summarizer')(
                 chunks[0],
                 max_length=max_length,
                 min_length=max(30, max_length // 3),
@@ -216,7 +223,7 @@ def summarize_text(text, max_length=150):
             for i, chunk in enumerate(chunks):
                 try:
                     chunk_max_len = max(min(max_length // len(chunks), 100), 50)
-                    chunk_summary = summarizer(
+                    chunk_summary = models.get('summarizer')(
                         chunk,
                         max_length=chunk_max_len,
                         min_length=max(20, chunk_max_len // 3),
@@ -236,7 +243,7 @@ def summarize_text(text, max_length=150):
 
             # If combined text is still long, do a final summarization
             if len(combined_text) > 500:
-                final_summary = summarizer(
+                final_summary = models.get('summarizer')(
                     combined_text,
                     max_length=max_length,
                     min_length=max(30, max_length // 3),
@@ -832,7 +839,10 @@ def scheduled_poster_worker(poll_interval_seconds=30):
         time.sleep(poll_interval_seconds)
 
 
-# Start the scheduler thread
-scheduler_thread = threading.Thread(target=scheduled_poster_worker, daemon=True)
-scheduler_thread.start()
-logger.info("✅ Scheduler thread started and running")
\ No newline at end of file
+# This poller doesn't lease rows, so it must not run beside app.py's scheduler.
+# Only start it when this module is run directly.
+if __name__ == '__main__':
+    scheduler_thread = threading.Thread(target=scheduled_poster_worker, daemon=True)
+    scheduler_thread.start()
+    logger.info("✅ Scheduler thread started and running")
+    scheduler_thread.join()
\ No newline at end of file
@@ -0,0 +1,121 @@
+import os
+import threading
+import logging
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '10'))
+TRANSPORT_RETRIES = int(os.getenv('HTTP_TRANSPORT_RETRIES', '2'))
+
+
+def _transport_retry():
+    """
+    Retry policy applied below the application layer.
+
+    Connection failures are retried for every method, since nothing reached the
+    server. 502/503/504 are only retried for idempotent methods, so a POST that
+    may have been delivered is never sent twice. Read errors and 429s are left to
+    the caller (the scheduler's backoff handles rate limits).
+    """
+    return Retry(
+        total=TRANSPORT_RETRIES,
+        connect=TRANSPORT_RETRIES,
+        read=0,
+        status=TRANSPORT_RETRIES,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+        backoff_factor=0.5,
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+
+
+class HostClient:
+    """
+    Keep-alive session for one scheme://host.
+
+    Requests reuse pooled connections (up to `pool_maxsize` concurrently), so
+    back-to-back calls such as sendPhoto followed by sendMessage skip the TCP and
+    TLS handshake. Every request gets a default (connect, read) timeout.
+    """
+
+    def __init__(self, base, pool_maxsize=POOL_MAXSIZE, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        self.base = base
+        self.timeout = timeout
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize,
+                                   max_retries=_transport_retry(), pool_block=False)
+        self.session = requests.Session()
+        self.session.mount(base, self.adapter)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        with self._lock:
+            self.requests += 1
+        try:
+            return self.session.request(method, url, **kwargs)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+
+    def stats(self):
+        # urllib3 counts new connections and requests per connection pool
+        connections_opened = 0
+        pool_requests = 0
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is not None:
+                connections_opened += pool.num_connections
+                pool_requests += pool.num_requests
+        with self._lock:
+            return {
+                'host': self.base,
+                'requests': self.requests,
+                'errors': self.errors,
+                'connections_opened': connections_opened,
+                'connections_reused': max(0, pool_requests - connections_opened)
+            }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(url):
+    """Return the process-wide client for the host of `url`, creating it on first use."""
+    parts = urlsplit(url)
+    base = f"{parts.scheme}://{parts.netloc}"
+    with _clients_lock:
+        client = _clients.get(base)
+        if client is None:
+            client = _clients[base] = HostClient(base)
+            logger.info(f"Opened HTTP connection pool for {base}")
+        return client
+
+
+def request(method, url, **kwargs):
+    return get_client(url).request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request('GET', url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request('POST', url, **kwargs)
+
+
+def pool_stats():
+    with _clients_lock:
+        clients = list(_clients.values())
+    return [client.stats() for client in clients]
@@ -0,0 +1,275 @@
+import os
+import queue
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Listener, Client
+
+import model_loaders
+from audio_stream import AudioStreamError
+from models import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = '/tmp/yt-summarizer-inference.sock'
+
+
+def parse_address(address):
+    """"host:port" becomes a TCP address; anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(':')
+    if sep and '/' not in address and port.isdigit():
+        return host, int(port)
+    return address
+
+
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def authkey_from_env():
+    """
+    INFERENCE_SERVER_AUTHKEY, shared by the server and its clients. Required: the
+    connection unpickles what the peer sends, so the key is the only thing between
+    a client and code execution in the server.
+    """
+    authkey = os.getenv('INFERENCE_SERVER_AUTHKEY')
+    if not authkey:
+        raise ValueError("INFERENCE_SERVER_AUTHKEY must be set to a shared secret to use the inference server")
+    return authkey.encode()
+
+
+def check_bind_address(address):
+    """Refuse TCP addresses other than loopback unless INFERENCE_SERVER_ALLOW_REMOTE=1."""
+    if isinstance(address, tuple) and address[0] not in LOOPBACK_HOSTS \
+            and os.getenv('INFERENCE_SERVER_ALLOW_REMOTE', '0') != '1':
+        raise ValueError(f"Refusing to listen on non-loopback address {address[0]}:{address[1]}; "
+                         f"set INFERENCE_SERVER_ALLOW_REMOTE=1 to allow it")
+
+
+class InferenceError(Exception):
+    """An inference call failed on the server (the message carries the server-side error)."""
+
+
+class InferenceServer:
+    """
+    Process that owns the transcription and summarization models and serves them
+    to every web worker over a local multiprocessing.connection socket, so the
+    weights are loaded once per host instead of once per worker.
+
+    Each client connection gets a thread. Transcriptions queue for
+    `transcribe_workers` threads; summarizations go through the summarizer's
+    micro-batcher, which merges calls from all connections into shared batches;
+    video URLs are streamed and decoded in the server, on the transcription threads;
+    tokenization (cheap) runs inline under a lock.
+    """
+
+    def __init__(self, registry, address, authkey, transcribe_workers=1, audio_dir='audio'):
+        check_bind_address(address)
+        self.registry = registry
+        self.address = address
+        self.authkey = authkey
+        # transcribe() only reads files under this directory (where the web workers download audio)
+        self.audio_dir = os.path.realpath(audio_dir)
+        self._transcribe_pool = ThreadPoolExecutor(max_workers=transcribe_workers, thread_name_prefix='transcribe')
+        self._tokenizer_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.calls = {}
+
+    def serve_forever(self):
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)  # stale socket from a previous run
+        with Listener(self.address, authkey=self.authkey) as listener:
+            if isinstance(self.address, str):
+                os.chmod(self.address, 0o600)  # only this user's processes may connect
+            logger.info(f"Inference server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logger.warning(f"Rejected inference connection: {e}")
+                    continue
+                threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with self._lock:
+            self.connections += 1
+        try:
+            while True:
+                try:
+                    op, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                with self._lock:
+                    self.calls[op] = self.calls.get(op, 0) + 1
+                handler = getattr(self, f'_op_{op}', None)
+                try:
+                    if handler is None:
+                        raise ValueError(f"Unknown inference operation {op!r}")
+                    reply = ('ok', handler(*args))
+                except Exception as e:
+                    reply = ('error', f"{type(e).__name__}: {e}")
+                conn.send(reply)
+        finally:
+            conn.close()
+            with self._lock:
+                self.connections -= 1
+
+    def _op_load(self, name):
+        model = self.registry.get(name)
+        if name == 'summarizer':
+            tokenizer = getattr(model, 'tokenizer', None)
+            return {'model_name': model_loaders.summarization_model_name,
+                    'model_max_length': getattr(tokenizer, 'model_max_length', None),
+                    'has_tokenizer': tokenizer is not None}
+        return {attr: getattr(model, attr, None)
+                for attr in ('backend', 'model_size', 'device', 'compute_type', 'beam_size', 'library_version',
+                             'cpu_threads')}
+
+    def _op_transcribe(self, file_path):
+        file_path = os.path.realpath(file_path)
+        if os.path.commonpath([file_path, self.audio_dir]) != self.audio_dir:
+            raise ValueError(f"Refusing to read audio outside {self.audio_dir}")
+        return self._transcribe_pool.submit(model_loaders.transcribe_file, self.registry, file_path).result()
+
+    def _op_transcribe_url(self, url):
+        # The server decodes the stream itself, so PCM never crosses the socket
+        return self._transcribe_pool.submit(model_loaders.transcribe_url, self.registry, url).result()
+
+    def _op_summarize(self, inputs, generation_kwargs):
+        return self.registry.get('summarizer')(inputs, **generation_kwargs)
+
+    def _op_tokenize(self, texts, kwargs):
+        tokenizer = self.registry.get('summarizer').tokenizer
+        with self._tokenizer_lock:
+            return tokenizer(texts, **kwargs)['input_ids']
+
+    def _op_identity(self):
+        return {'transcription': model_loaders.transcription_identity(),
+                'summarization_model': model_loaders.summarization_model_name}
+
+    def _op_stats(self):
+        with self._lock:
+            stats = {'connections': self.connections, 'calls': dict(self.calls)}
+        if self.registry.is_loaded('summarizer'):
+            stats['summary_batcher'] = self.registry.get('summarizer').batcher.stats()
+        stats['models'] = self.registry.status()
+        return stats
+
+
+class InferenceClient:
+    """
+    Thread-safe client for the inference server: keeps a small pool of open
+    connections so concurrent request threads don't serialize on one socket.
+    """
+
+    def __init__(self, address, authkey, max_idle=8):
+        self.address = address
+        self.authkey = authkey
+        self.max_idle = max_idle
+        self._idle = queue.LifoQueue()
+
+    def call(self, op, *args):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+        try:
+            status, result = self._request(conn, op, args)
+        except (EOFError, OSError):
+            if conn is None:
+                raise
+            # The pooled connection went stale (server restarted or dropped it while idle)
+            logger.info(f"Inference connection dropped, retrying {op} on a new one")
+            status, result = self._request(None, op, args)
+        if status != 'ok':
+            raise InferenceError(result)
+        return result
+
+    def _request(self, conn, op, args):
+        """Send one request on `conn` (a new connection if None) and pool it again afterwards."""
+        if conn is None:
+            conn = Client(self.address, authkey=self.authkey)
+        try:
+            conn.send((op, args))
+            reply = conn.recv()
+        except BaseException:
+            conn.close()
+            raise
+        if self._idle.qsize() < self.max_idle:
+            self._idle.put(conn)
+        else:
+            conn.close()
+        return reply
+
+
+class RemoteTranscriber:
+    """Stands in for a local transcriber; transcription runs in the inference server."""
+
+    def __init__(self, client, info):
+        self.client = client
+        self.__dict__.update(info)
+
+    def transcribe(self, file_path):
+        # Same host: the server reads the audio file directly
+        return self.client.call('transcribe', os.path.abspath(file_path))
+
+    def transcribe_url(self, url):
+        try:
+            return self.client.call('transcribe_url', url)
+        except InferenceError as e:
+            # Let the caller fall back to downloading, as it would for a local stream failure
+            if str(e).startswith(f"{AudioStreamError.__name__}:"):
+                raise AudioStreamError(str(e)) from e
+            raise
+
+
+class RemoteTokenizer:
+    def __init__(self, client, model_max_length):
+        self.client = client
+        self.model_max_length = model_max_length
+
+    def __call__(self, texts, **kwargs):
+        return {'input_ids': self.client.call('tokenize', list(texts), kwargs)}
+
+
+class RemoteSummarizer:
+    """Callable like a transformers summarization pipeline; generation runs in the inference server."""
+
+    def __init__(self, client, info):
+        self.client = client
+        self.model_name = info['model_name']
+        self.tokenizer = RemoteTokenizer(client, info['model_max_length']) if info['has_tokenizer'] else None
+
+    def __call__(self, inputs, **generation_kwargs):
+        # The server picks its own batch size across all callers
+        generation_kwargs.pop('batch_size', None)
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs)
+        return self.client.call('summarize', inputs, generation_kwargs)
+
+
+def register_remote_models(registry, client):
+    """Register loaders that connect to the inference server instead of loading weights locally."""
+    registry.register('transcriber', lambda: RemoteTranscriber(client, client.call('load', 'transcriber')))
+    registry.register('summarizer', lambda: RemoteSummarizer(client, client.call('load', 'summarizer')))
+
+
+def main():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    registry = ModelRegistry()
+    model_loaders.register_local_models(registry)
+    registry.warm_up(['transcriber', 'summarizer'])
+    server = InferenceServer(
+        registry,
+        parse_address(os.getenv('INFERENCE_SERVER_ADDRESS', DEFAULT_ADDRESS)),
+        authkey_from_env(),
+        transcribe_workers=int(os.getenv('INFERENCE_TRANSCRIBE_WORKERS', '1')),
+        audio_dir=os.getenv('INFERENCE_AUDIO_DIR', 'audio')
+    )
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import threading
+import uuid
+import datetime
+import logging
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue already holds its maximum number of pending jobs."""
+
+
+class JobQueue:
+    """
+    Bounded worker pool for long-running pipeline jobs (download, transcribe, summarize).
+
+    Submitting returns a job id immediately; the job function runs on one of
+    `max_workers` threads and reports progress through `set_stage(name)`.
+    Clients read job snapshots with `get()` or block on `wait_for_change()`.
+    """
+
+    def __init__(self, max_workers=2, max_pending=20, max_finished=200):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job-worker')
+        self._jobs = OrderedDict()
+        self._changed = threading.Condition()
+
+    def submit(self, kind, fn, *args, **kwargs):
+        """
+        Queue `fn(*args, set_stage=..., **kwargs)` and return the new job id.
+        The return value of `fn` becomes the job result; an exception fails the job.
+        """
+        with self._changed:
+            pending = sum(1 for job in self._jobs.values() if job['status'] not in FINISHED_STATES)
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({pending} jobs pending)")
+
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'kind': kind,
+                'status': JOB_QUEUED,
+                'stage': None,
+                'stages': [],
+                'result': None,
+                'error': None,
+                'created_at': datetime.datetime.utcnow().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'version': 0,
+            }
+            self._prune_finished()
+
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        logger.info(f"Queued {kind} job {job_id}")
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if it is unknown (or was pruned)."""
+        with self._changed:
+            job = self._jobs.get(job_id)
+            return dict(job, stages=list(job['stages'])) if job else None
+
+    def wait_for_change(self, job_id, version, timeout=15):
+        """
+        Block until the job's version moves past `version`, it finishes, or `timeout` elapses.
+        Returns the latest snapshot (None for unknown jobs).
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: job_id not in self._jobs
+                        or self._jobs[job_id]['version'] > version
+                        or self._jobs[job_id]['status'] in FINISHED_STATES,
+                timeout=timeout
+            )
+        return self.get(job_id)
+
+    def stats(self):
+        """Count jobs by status for the admin dashboard."""
+        with self._changed:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {'max_workers': self.max_workers, 'max_pending': self.max_pending, 'job_counts': counts}
+
+    def _update(self, job_id, **fields):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            job.update(fields)
+            job['version'] += 1
+            self._changed.notify_all()
+
+    def _set_stage(self, job_id, stage):
+        with self._changed:
+            job = self._jobs.get(job_id)
+            if job:
+                job['stages'].append(stage)
+        logger.info(f"Job {job_id} stage: {stage}")
+        self._update(job_id, stage=stage)
+
+    def _run(self, job_id, fn, args, kwargs):
+        self._update(job_id, status=JOB_RUNNING, started_at=datetime.datetime.utcnow().isoformat())
+        try:
+            result = fn(*args, set_stage=lambda stage: self._set_stage(job_id, stage), **kwargs)
+            self._update(job_id, status=JOB_SUCCEEDED, result=result,
+                         finished_at=datetime.datetime.utcnow().isoformat())
+            logger.info(f"Job {job_id} finished")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            logger.debug(traceback.format_exc())
+            self._update(job_id, status=JOB_FAILED, error=str(e),
+                         finished_at=datetime.datetime.utcnow().isoformat())
+
+    def _prune_finished(self):
+        # Caller holds the lock. Oldest finished jobs are dropped first.
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED_STATES]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
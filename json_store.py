@@ -0,0 +1,161 @@
+import os
+import copy
+import json
+import atexit
+import tempfile
+import threading
+import time
+import logging
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Process-wide lock serializing every JSON file write made through this module
+_write_lock = threading.RLock()
+
+
+def atomic_write_json(path, data):
+    """
+    Write `data` as JSON to a temp file in the target directory, fsync it and rename
+    it over `path`. Readers see either the old file or the new one, never a partial write.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    with _write_lock:
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+class JsonFileStore:
+    """
+    JSON document backed by a file, shared safely by several processes.
+
+    Mutations go through `update(fn)`: `fn(data)` is applied to the in-memory copy at
+    once and kept until the next flush. A background writer coalesces bursts of
+    updates into one flush `flush_delay` seconds after the first; pending changes are
+    also flushed at interpreter exit. A flush takes an exclusive lock on
+    `<path>.lock`, re-reads the file, replays this process's pending updates on top
+    and writes the result atomically, so writers in other processes never lose each
+    other's changes. Reads reload the file when another process has rewritten it.
+    """
+
+    def __init__(self, path, flush_delay=1.0):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self.flush_delay = flush_delay
+        self.flush_count = 0
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._pending = []
+        self._signature = self._file_signature()
+        self._data = self._load()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name=f"json-flush-{path}")
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read_file(self):
+        # Raises on a corrupt file, so a flush never overwrites it with only our changes
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def _load(self):
+        try:
+            return self._read_file()
+        except Exception as e:
+            logger.error(f"Error loading {self.path}: {e}")
+        return {}
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            # No flock (Windows): single-process use only
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        # Caller holds the lock. Picks up writes from other processes, keeping our pending updates.
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        data = self._load()
+        for fn in self._pending:
+            fn(data)
+        self._data = data
+        self._signature = signature
+
+    def read(self):
+        """Return a deep copy of the current document."""
+        with self._lock:
+            self._refresh()
+            return copy.deepcopy(self._data)
+
+    def update(self, fn):
+        """Apply `fn(data)` to the document in place and schedule a coalesced flush."""
+        with self._lock:
+            self._refresh()
+            result = fn(self._data)
+            self._pending.append(fn)
+        self._dirty.set()
+        return result
+
+    def flush(self):
+        """Write pending changes now."""
+        with self._lock:
+            self._dirty.clear()
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            with _write_lock, self._file_lock():
+                data = self._read_file()
+                for fn in pending:
+                    fn(data)
+                atomic_write_json(self.path, data)
+                signature = self._file_signature()
+            with self._lock:
+                # Updates made while we were writing stay pending on top of the merged document
+                for fn in self._pending:
+                    fn(data)
+                self._data = data
+                self._signature = signature
+            self.flush_count += 1
+        except Exception as e:
+            with self._lock:
+                self._pending = pending + self._pending
+            self._dirty.set()
+            logger.error(f"Error saving {self.path}: {e}")
+
+    def _flush_loop(self):
+        while True:
+            self._dirty.wait()
+            # Let the rest of the burst land before writing once
+            time.sleep(self.flush_delay)
+            self.flush()
@@ -0,0 +1,119 @@
+import os
+
+from transcriber import create_transcriber, resolve_backend, model_identity
+from parallel_transcription import ParallelTranscriber, probe_duration
+from batching import BatchedPipeline
+from audio_stream import SAMPLE_RATE, load_audio
+from summarization_engines import ENGINES, build_summarization_pipeline, engine_model_name
+
+# Transcription backend: "whisper" (reference PyTorch) or "faster-whisper" (CTranslate2, int8 on CPU)
+TRANSCRIBE_BACKEND = resolve_backend(os.getenv('TRANSCRIBE_BACKEND', 'whisper'))
+WHISPER_MODEL_SIZE = os.getenv('WHISPER_MODEL_SIZE', 'base')
+WHISPER_COMPUTE_TYPE = os.getenv('WHISPER_COMPUTE_TYPE') or None
+WHISPER_CPU_THREADS = int(os.getenv('WHISPER_CPU_THREADS', '0')) or None
+WHISPER_BEAM_SIZE = int(os.getenv('WHISPER_BEAM_SIZE', '0')) or None
+
+# Long audio is split at silences and transcribed across worker processes when
+# TRANSCRIBE_PARALLEL_WORKERS > 1; shorter files stay on the in-process model
+TRANSCRIBE_PARALLEL_WORKERS = int(os.getenv('TRANSCRIBE_PARALLEL_WORKERS', '1'))
+TRANSCRIBE_PARALLEL_MIN_SECONDS = float(os.getenv('TRANSCRIBE_PARALLEL_MIN_SECONDS', '900'))
+
+SUMMARIZATION_MODEL = os.getenv('SUMMARIZATION_MODEL', 'facebook/bart-large-cnn')
+# "pytorch" (as published), "int8" (dynamic quantization, CPU) or "onnx" (ONNX Runtime export)
+SUMMARIZATION_ENGINE = os.getenv('SUMMARIZATION_ENGINE', 'pytorch')
+if SUMMARIZATION_ENGINE not in ENGINES:
+    raise ValueError(f"Unknown SUMMARIZATION_ENGINE {SUMMARIZATION_ENGINE!r}; expected one of {', '.join(ENGINES)}")
+# Concurrent summarizer calls are merged into batches of up to SUMMARY_MICROBATCH_MAX inputs,
+# waiting at most SUMMARY_MICROBATCH_WAIT_MS for other callers to join
+SUMMARY_MICROBATCH_MAX = max(1, int(os.getenv('SUMMARY_MICROBATCH_MAX', '8')))
+SUMMARY_MICROBATCH_WAIT_MS = float(os.getenv('SUMMARY_MICROBATCH_WAIT_MS', '10'))
+# Name the summary cache keys on; follows the engine that actually loaded, or "default"
+summarization_model_name = engine_model_name(SUMMARIZATION_MODEL, SUMMARIZATION_ENGINE)
+
+_device = None
+
+
+def get_device():
+    """"cuda" or "cpu"; imports torch on first call only."""
+    global _device
+    if _device is None:
+        _device = os.getenv('MODEL_DEVICE')
+        if not _device:
+            import torch
+            _device = "cuda" if torch.cuda.is_available() else "cpu"
+        print("Using device:", _device)
+    return _device
+
+
+def load_transcriber():
+    transcriber = create_transcriber(TRANSCRIBE_BACKEND, WHISPER_MODEL_SIZE, device=get_device(),
+                                     compute_type=WHISPER_COMPUTE_TYPE, cpu_threads=WHISPER_CPU_THREADS,
+                                     beam_size=WHISPER_BEAM_SIZE)
+    print(f"✅ Using {transcriber.backend} ({WHISPER_MODEL_SIZE}, {transcriber.compute_type}) for transcription")
+    return transcriber
+
+
+def load_parallel_transcriber():
+    # Cheap: worker processes start (and load their own models) on first use
+    return ParallelTranscriber(
+        {'backend': TRANSCRIBE_BACKEND, 'model_size': WHISPER_MODEL_SIZE, 'device': get_device(),
+         'compute_type': WHISPER_COMPUTE_TYPE, 'beam_size': WHISPER_BEAM_SIZE},
+        workers=TRANSCRIBE_PARALLEL_WORKERS,
+        segment_seconds=float(os.getenv('TRANSCRIBE_SEGMENT_SECONDS', '300')))
+
+
+def load_summarizer():
+    global summarization_model_name
+    from transformers import pipeline
+
+    device = get_device()
+    # An engine that can't run here (int8 on CUDA, optimum missing for onnx) falls back
+    # to the same model on pytorch, not to the library's default summarization model
+    engines = [SUMMARIZATION_ENGINE] + (['pytorch'] if SUMMARIZATION_ENGINE != 'pytorch' else [])
+    summarizer = None
+    for engine in engines:
+        try:
+            # Try to use BART model for better summarization
+            summarizer = build_summarization_pipeline(SUMMARIZATION_MODEL, engine, device)
+        except Exception as e:
+            print(f"⚠️  Could not load {SUMMARIZATION_MODEL} ({engine}): {e}")
+            continue
+        summarization_model_name = engine_model_name(SUMMARIZATION_MODEL, engine)
+        print(f"✅ Using {SUMMARIZATION_MODEL} ({engine}) for summarization")
+        break
+    if summarizer is None:
+        print("⚠️  Using the default summarization model")
+        summarization_model_name = "default"
+        summarizer = pipeline("summarization", device=0 if device == "cuda" else -1)
+    return BatchedPipeline(summarizer, SUMMARY_MICROBATCH_MAX, SUMMARY_MICROBATCH_WAIT_MS / 1000)
+
+
+def register_local_models(registry):
+    """Register in-process loaders for every model the app uses."""
+    registry.register('transcriber', load_transcriber)
+    registry.register('parallel_transcriber', load_parallel_transcriber)
+    registry.register('summarizer', load_summarizer)
+
+
+def transcription_identity():
+    """(model name, version) keying the transcript cache; needs no loaded model."""
+    return model_identity(TRANSCRIBE_BACKEND, WHISPER_MODEL_SIZE, get_device(), WHISPER_COMPUTE_TYPE,
+                          WHISPER_BEAM_SIZE)
+
+
+def transcribe_file(registry, audio):
+    """
+    Transcribe in one pass, or split at silences across worker processes when parallel
+    transcription is enabled and the audio is long enough. `audio` is a file path or
+    16 kHz mono float32 samples. Returns {text, language, segments}.
+    """
+    if TRANSCRIBE_PARALLEL_WORKERS > 1 and registry.has('parallel_transcriber'):
+        duration = probe_duration(audio) if isinstance(audio, str) else len(audio) / SAMPLE_RATE
+        if duration and duration >= TRANSCRIBE_PARALLEL_MIN_SECONDS:
+            return registry.get('parallel_transcriber').transcribe(audio, duration=duration)
+    return registry.get('transcriber').transcribe(audio)
+
+
+def transcribe_url(registry, url):
+    """Decode the video's audio stream to PCM in memory and transcribe it; no audio file is written."""
+    return transcribe_file(registry, load_audio(url))
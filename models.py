@@ -0,0 +1,105 @@
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+NOT_LOADED = 'not_loaded'
+LOADING = 'loading'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class ModelRegistry:
+    """
+    Loads heavy models on first use instead of at import time.
+
+    Each model is registered with a loader function; `get(name)` runs the loader
+    once (other threads asking for the same model wait for it) and returns the
+    cached result afterwards. `warm_up()` loads models on a background thread so a
+    freshly started server can answer /health immediately and report readiness
+    once loading finishes. A failed load is retried on the next `get`.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._warm_up_thread = None
+
+    def register(self, name, loader):
+        with self._lock:
+            self._entries[name] = {
+                'loader': loader,
+                'value': None,
+                'state': NOT_LOADED,
+                'error': None,
+                'load_seconds': None,
+                'lock': threading.Lock()
+            }
+
+    def _entry(self, name):
+        with self._lock:
+            return self._entries[name]
+
+    def get(self, name):
+        entry = self._entry(name)
+        if entry['state'] == READY:
+            return entry['value']
+        with entry['lock']:
+            if entry['state'] == READY:
+                return entry['value']
+            entry['state'] = LOADING
+            started = time.monotonic()
+            logger.info(f"Loading model '{name}'...")
+            try:
+                value = entry['loader']()
+            except Exception as e:
+                entry['state'] = FAILED
+                entry['error'] = f"{type(e).__name__}: {e}"
+                logger.error(f"Loading model '{name}' failed: {e}")
+                raise
+            entry['value'] = value
+            entry['load_seconds'] = round(time.monotonic() - started, 2)
+            entry['error'] = None
+            entry['state'] = READY
+            logger.info(f"Model '{name}' loaded in {entry['load_seconds']}s")
+            return value
+
+    def has(self, name):
+        with self._lock:
+            return name in self._entries
+
+    def is_loaded(self, name):
+        return self._entry(name)['state'] == READY
+
+    def warm_up(self, names=None):
+        """
+        Load `names` (default: every registered model) on a background thread.
+        While a warm-up is still running, calling this again just returns its thread.
+        """
+        with self._lock:
+            if self._warm_up_thread is not None and self._warm_up_thread.is_alive():
+                return self._warm_up_thread
+            names = list(names if names is not None else self._entries)
+
+        def _load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    pass  # already logged and recorded in status()
+
+        thread = threading.Thread(target=_load_all, daemon=True, name='model-warm-up')
+        with self._lock:
+            self._warm_up_thread = thread
+        thread.start()
+        return thread
+
+    def ready(self, names):
+        return all(self.is_loaded(name) for name in names)
+
+    def status(self):
+        with self._lock:
+            entries = dict(self._entries)
+        return {name: {'state': entry['state'], 'load_seconds': entry['load_seconds'], 'error': entry['error']}
+                for name, entry in entries.items()}
@@ -0,0 +1,260 @@
+import os
+import re
+import sys
+import json
+import queue
+import atexit
+import shutil
+import tempfile
+import threading
+import subprocess
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from transcriber import create_transcriber
+from audio_stream import SAMPLE_RATE, write_wav
+
+logger = logging.getLogger(__name__)
+
+SILENCE_START = re.compile(r'silence_start: (-?[\d.]+)')
+SILENCE_END = re.compile(r'silence_end: (-?[\d.]+)')
+
+# Longest run of words compared when removing text repeated across a hard cut
+MAX_OVERLAP_WORDS = 30
+# Shorter matches ("the", "and so") are as likely to be coincidence as repeated audio
+MIN_OVERLAP_WORDS = 3
+
+
+def probe_duration(path):
+    """Audio duration in seconds (ffprobe), or None if it can't be read."""
+    try:
+        output = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'default=nw=1:nk=1', path],
+            capture_output=True, text=True, check=True).stdout
+        return float(output.strip())
+    except Exception as e:
+        logger.warning(f"Could not probe duration of {path}: {e}")
+        return None
+
+
+def detect_silences(path, noise_db=-35, min_silence=0.5):
+    """(start, end) of every silence ffmpeg's silencedetect finds in the file."""
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', '-nostats', '-i', path,
+         '-af', f'silencedetect=noise={noise_db}dB:d={min_silence}', '-f', 'null', '-'],
+        capture_output=True, text=True)
+    silences = []
+    start = None
+    for line in result.stderr.splitlines():
+        match = SILENCE_START.search(line)
+        if match:
+            start = max(0.0, float(match.group(1)))
+            continue
+        match = SILENCE_END.search(line)
+        if match and start is not None:
+            silences.append((start, float(match.group(1))))
+            start = None
+    return silences
+
+
+def plan_segments(duration, silences, target_seconds=300, overlap_seconds=2.0):
+    """
+    Split [0, duration] into segments of roughly `target_seconds`.
+
+    Each cut goes at the middle of the silence closest to the target boundary
+    (searched within half a segment either side), so no word is split. Where there
+    is no silence to cut at, the cut is hard and the next segment starts
+    `overlap_seconds` early; the repeated words are removed when stitching.
+    Returns a list of (start, end, overlapped) tuples.
+    """
+    midpoints = [(start + end) / 2 for start, end in silences]
+    segments = []
+    start = 0.0
+    overlapped = False
+    while duration - start > target_seconds * 1.5:
+        target = start + target_seconds
+        candidates = [m for m in midpoints if target - target_seconds / 2 <= m <= target + target_seconds / 2]
+        if candidates:
+            cut = min(candidates, key=lambda m: abs(m - target))
+            segments.append((start, cut, overlapped))
+            start, overlapped = cut, False
+        else:
+            segments.append((start, target, overlapped))
+            start, overlapped = target - overlap_seconds, True
+    segments.append((start, duration, overlapped))
+    return segments
+
+
+def _words(text):
+    return [re.sub(r'[^\w]', '', word).lower() for word in text.split()]
+
+
+def stitch(texts, overlapped):
+    """
+    Join segment transcripts in order. For a segment that starts inside the
+    previous one (`overlapped`), drop its leading words that repeat the longest
+    matching tail of the text so far, if at least MIN_OVERLAP_WORDS long.
+    """
+    words = []
+    for text, overlaps_previous in zip(texts, overlapped):
+        segment_words = text.split()
+        if overlaps_previous and words:
+            tail = _words(' '.join(words[-MAX_OVERLAP_WORDS:]))
+            head = _words(' '.join(segment_words[:MAX_OVERLAP_WORDS]))
+            for size in range(min(len(tail), len(head)), MIN_OVERLAP_WORDS - 1, -1):
+                if tail[-size:] == head[:size]:
+                    segment_words = segment_words[size:]
+                    break
+        words.extend(segment_words)
+    return ' '.join(words)
+
+
+def _cut_segment(source, start, end, segment_path):
+    """Cut [start, end] of the source to 16 kHz mono WAV."""
+    subprocess.run(
+        ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-y', '-ss', f'{start:.3f}', '-t', f'{end - start:.3f}',
+         '-i', source, '-ac', '1', '-ar', '16000', segment_path],
+        check=True)
+
+
+class _Worker:
+    """
+    One transcription worker: `python parallel_transcription.py <config>` loads its
+    own model, then answers one JSON job per line on stdin with one JSON result per
+    line on stdout. A plain subprocess rather than multiprocessing, because spawned
+    multiprocessing children re-run the parent's main script (app.py), models and all.
+    """
+
+    def __init__(self, config):
+        self.process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), json.dumps(config)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1)
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def run(self, job):
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError(f"Transcription worker exited with code {self.process.wait()}")
+        reply = json.loads(line)
+        if 'error' in reply:
+            raise RuntimeError(f"Transcription worker failed: {reply['error']}")
+        return reply['result']
+
+    def stop(self):
+        if self.alive():
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class ParallelTranscriber:
+    """
+    Transcribes long audio by splitting it at silences and running the segments
+    across a pool of worker processes, each with its own copy of the model.
+
+    Workers start on first use and stay up, so the model load is paid once per
+    worker. CPU threads are divided between workers so they don't oversubscribe
+    the cores.
+    """
+
+    def __init__(self, transcriber_config, workers=None, segment_seconds=300, overlap_seconds=2.0):
+        self.workers = workers or os.cpu_count() or 1
+        self.segment_seconds = segment_seconds
+        self.overlap_seconds = overlap_seconds
+        self.config = dict(transcriber_config)
+        if not self.config.get('cpu_threads'):
+            self.config['cpu_threads'] = max(1, (os.cpu_count() or 1) // self.workers)
+        self._idle = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._threads = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='transcribe-segment')
+        atexit.register(self.shutdown)
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle.empty() and self._started < self.workers:
+                self._started += 1
+                return _Worker(self.config)
+        return self._idle.get()
+
+    def _run_segment(self, job):
+        worker = self._checkout()
+        try:
+            result = worker.run(job)
+        except Exception:
+            if worker.alive():
+                self._idle.put(worker)
+            else:
+                with self._lock:
+                    self._started -= 1
+            raise
+        self._idle.put(worker)
+        return result
+
+    def transcribe(self, audio, duration=None):
+        """
+        Same result shape as a single-process transcriber: {text, language, segments}.
+        `audio` is a file path or 16 kHz mono float32 samples; samples are written to
+        a WAV in the work directory for the worker processes to cut from.
+        """
+        in_memory = not isinstance(audio, str)
+        workdir = tempfile.mkdtemp(prefix='segments_',
+                                   dir=None if in_memory else os.path.dirname(os.path.abspath(audio)))
+        try:
+            if in_memory:
+                duration = len(audio) / SAMPLE_RATE
+                file_path = os.path.join(workdir, 'source.wav')
+                write_wav(audio, file_path)
+            else:
+                file_path = audio
+                duration = duration or probe_duration(file_path)
+            segments = plan_segments(duration, detect_silences(file_path), self.segment_seconds, self.overlap_seconds)
+            logger.info(f"Transcribing {duration:.0f}s of audio as {len(segments)} segments on {self.workers} workers")
+
+            jobs = [{'source': file_path, 'start': start, 'end': end,
+                     'segment_path': os.path.join(workdir, f"segment_{index:04d}.wav")}
+                    for index, (start, end, _) in enumerate(segments)]
+            results = list(self._threads.map(self._run_segment, jobs))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        return {
+            'text': stitch([result['text'] for result in results], [overlapped for _, _, overlapped in segments]),
+            'language': results[0].get('language') if results else None,
+            'segments': [segment for result in results for segment in result['segments']]
+        }
+
+    def shutdown(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().stop()
+
+
+def _worker_main(config):
+    # Keep the protocol on the real stdout; anything the model libraries print goes to stderr
+    protocol = os.fdopen(os.dup(1), 'w', buffering=1)
+    os.dup2(2, 1)
+    transcriber = create_transcriber(**config)
+    for line in sys.stdin:
+        job = json.loads(line)
+        try:
+            _cut_segment(job['source'], job['start'], job['end'], job['segment_path'])
+            try:
+                result = transcriber.transcribe(job['segment_path'])
+            finally:
+                os.remove(job['segment_path'])
+            for segment in result['segments']:
+                segment['start'] += job['start']
+                segment['end'] += job['start']
+            protocol.write(json.dumps({'result': result}) + "\n")
+        except Exception as e:
+            protocol.write(json.dumps({'error': f"{type(e).__name__}: {e}"}) + "\n")
+
+
+if __name__ == '__main__':
+    _worker_main(json.loads(sys.argv[1]))
@@ -0,0 +1,187 @@
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_KEY = '*'
+
+# Documented bot limits: Telegram ~30 msg/s overall, 20 msg/min per group and ~1 msg/s
+# per private chat; Discord 50 req/s overall, with per-route buckets it reports in headers
+TELEGRAM_GLOBAL_PER_SECOND = float(os.getenv('TELEGRAM_GLOBAL_PER_SECOND', '30'))
+TELEGRAM_GROUP_PER_MINUTE = float(os.getenv('TELEGRAM_GROUP_PER_MINUTE', '20'))
+DISCORD_GLOBAL_PER_SECOND = float(os.getenv('DISCORD_GLOBAL_PER_SECOND', '50'))
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a send can't get a token within the allowed wait; retry_after is in seconds."""
+
+    def __init__(self, platform, key, retry_after):
+        super().__init__(f"{platform} rate limit for {key}: retry in {retry_after:.1f}s")
+        self.platform = platform
+        self.key = key
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `rate` tokens/second up to `capacity`.
+    `block()` empties it until a given time (a 429 or an exhausted server window),
+    after which it restarts with `tokens_after` tokens. Not thread-safe on its own;
+    RateLimiter serializes access.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.tokens_after_block = None
+        self.server_bucket = None
+
+    def _refill(self, now):
+        if now < self.blocked_until:
+            self.updated = now
+            return
+        if self.tokens_after_block is not None:
+            self.tokens = self.tokens_after_block
+            self.tokens_after_block = None
+            self.updated = self.blocked_until
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def block(self, until, tokens_after):
+        if until > self.blocked_until:
+            self.blocked_until = until
+            self.tokens = 0
+            self.tokens_after_block = tokens_after
+
+    def stats(self, now):
+        self._refill(now)
+        return {
+            'rate_per_second': round(self.rate, 3),
+            'capacity': self.capacity,
+            'tokens': round(self.tokens, 2),
+            'blocked_for': round(max(0.0, self.blocked_until - now), 2),
+            'server_bucket': self.server_bucket
+        }
+
+
+class RateLimiter:
+    """
+    Outbound rate limiter for bot APIs, keyed by (platform, chat/channel).
+
+    Every send takes a token from the platform's global bucket and from the bucket
+    of its chat or channel, waiting if either is empty. Buckets start from the
+    documented limits and are corrected by what the APIs report: Discord's
+    X-RateLimit-* headers resize and resync the channel bucket, and a 429's
+    retry_after (Telegram or Discord) pauses the bucket that was hit.
+    """
+
+    def __init__(self, max_wait=60.0):
+        self.max_wait = max_wait
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+        self.throttled = 0
+
+    def _default_bucket(self, platform, key):
+        if platform == 'telegram':
+            if key == GLOBAL_KEY:
+                return TokenBucket(TELEGRAM_GLOBAL_PER_SECOND, TELEGRAM_GLOBAL_PER_SECOND)
+            # Group and channel ids are negative; private chats allow about one message a second
+            if str(key).startswith('-'):
+                return TokenBucket(TELEGRAM_GROUP_PER_MINUTE / 60, 3)
+            return TokenBucket(1.0, 1)
+        if platform == 'discord':
+            if key == GLOBAL_KEY:
+                return TokenBucket(DISCORD_GLOBAL_PER_SECOND, DISCORD_GLOBAL_PER_SECOND)
+            # Conservative until the first response reports the real bucket
+            return TokenBucket(1.0, 5)
+        return TokenBucket(1.0, 1)
+
+    def _bucket(self, platform, key):
+        # Caller holds the lock
+        bucket = self._buckets.get((platform, key))
+        if bucket is None:
+            bucket = self._buckets[(platform, key)] = self._default_bucket(platform, key)
+        return bucket
+
+    def acquire(self, platform, key, max_wait=None):
+        """
+        Block until both the global and the per-key bucket have a token, then take one
+        from each. Raises RateLimitExceeded if that would take longer than max_wait.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+        started = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                buckets = [self._bucket(platform, GLOBAL_KEY), self._bucket(platform, key)]
+                wait = max(bucket.wait_time(now) for bucket in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    self.acquired += 1
+                    self.waited_seconds += now - started
+                    return now - started
+                if now + wait > deadline:
+                    self.throttled += 1
+                    raise RateLimitExceeded(platform, key, wait)
+            time.sleep(wait)
+
+    def observe(self, platform, key, response, retry_after=None):
+        """Update the buckets for `platform`/`key` from an API response."""
+        now = time.monotonic()
+        headers = response.headers
+        with self._lock:
+            bucket = self._bucket(platform, key)
+            if platform == 'discord' and 'X-RateLimit-Limit' in headers:
+                try:
+                    limit = int(headers['X-RateLimit-Limit'])
+                    remaining = int(headers.get('X-RateLimit-Remaining', limit))
+                    reset_after = float(headers.get('X-RateLimit-Reset-After', 0))
+                except ValueError:
+                    limit = None
+                if limit:
+                    bucket.capacity = limit
+                    bucket.server_bucket = headers.get('X-RateLimit-Bucket', bucket.server_bucket)
+                    if remaining == limit - 1 and reset_after > 0:
+                        # First request of a fresh window: reset_after is the window length
+                        bucket.rate = limit / reset_after
+                    bucket.tokens = min(bucket.tokens, remaining)
+                    if remaining == 0 and reset_after > 0:
+                        bucket.block(now + reset_after, tokens_after=limit)
+
+            if response.status_code == 429 and retry_after:
+                if platform == 'discord' and headers.get('X-RateLimit-Global'):
+                    bucket = self._bucket(platform, GLOBAL_KEY)
+                bucket.block(now + float(retry_after), tokens_after=1)
+                logger.warning(f"{platform} rate limited {key}; pausing sends for {retry_after}s")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'acquired': self.acquired,
+                'waited_seconds': round(self.waited_seconds, 2),
+                'throttled': self.throttled,
+                'buckets': {f"{platform}:{key}": bucket.stats(now)
+                            for (platform, key), bucket in self._buckets.items()}
+            }
@@ -0,0 +1,248 @@
+import heapq
+import threading
+import time
+import datetime
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class PostScheduler:
+    """
+    Event-driven timer for scheduled posts.
+
+    Keeps an in-memory min-heap of (schedule_time_utc, row_id) loaded from
+    scheduled_posts and sleeps exactly until the earliest entry is due, instead of
+    polling the database on a fixed interval. `notify()` wakes the worker
+    immediately when a post is scheduled earlier than anything in the heap.
+
+    The heap is only a timer: when something is due the `dispatch` callback
+    re-reads due rows from the database, which stays the source of truth. The heap
+    is rebuilt every `resync_seconds`, and within `poll_seconds` of `changed()`
+    reporting a write, to pick up rows written by other processes or edited
+    through the admin API.
+    """
+
+    def __init__(self, load_upcoming, dispatch, resync_seconds=300, changed=None, poll_seconds=2):
+        """
+        load_upcoming() -> iterable of (row_id, schedule_time_utc) for rows still 'scheduled'
+        dispatch() processes every post that is due now
+        changed() -> True if the table may have been written since the last call
+        """
+        self.load_upcoming = load_upcoming
+        self.dispatch = dispatch
+        self.resync_seconds = resync_seconds
+        self.changed = changed
+        self.poll_seconds = poll_seconds
+        self._heap = []
+        self._wakeup = threading.Condition()
+        self._next_resync = None
+        self._poked = False
+        self.dispatch_count = 0
+
+    @staticmethod
+    def _as_datetime(value):
+        if isinstance(value, datetime.datetime):
+            return value
+        return datetime.datetime.fromisoformat(value)
+
+    def notify(self, row_id, schedule_time_utc):
+        """Add a newly scheduled post; wakes the worker if it is due before the current head."""
+        when = self._as_datetime(schedule_time_utc)
+        with self._wakeup:
+            earlier = not self._heap or when < self._heap[0][0]
+            heapq.heappush(self._heap, (when, row_id))
+            if earlier:
+                self._wakeup.notify()
+
+    def poke(self):
+        """Run `dispatch` again as soon as possible, e.g. once capacity frees up for posts left due."""
+        with self._wakeup:
+            self._poked = True
+            self._wakeup.notify()
+
+    def resync(self):
+        """Rebuild the heap from the database."""
+        # A row without a due time can't be timed; skip it rather than fail every resync
+        entries = [(self._as_datetime(when), row_id) for row_id, when in self.load_upcoming() if when]
+        heapq.heapify(entries)
+        with self._wakeup:
+            self._heap = entries
+            self._next_resync = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.resync_seconds)
+            self._wakeup.notify()
+        logger.info(f"Scheduler heap loaded with {len(entries)} upcoming posts")
+
+    def next_due(self):
+        with self._wakeup:
+            return self._heap[0][0].isoformat() if self._heap else None
+
+    def _pop_due(self, now):
+        # Caller holds the lock. Returns True if anything was due.
+        due = False
+        while self._heap and self._heap[0][0] <= now:
+            heapq.heappop(self._heap)
+            due = True
+        return due
+
+    def run(self):
+        logger.info(f"Event-driven scheduler started (resync every {self.resync_seconds}s)")
+        while True:
+            try:
+                now = datetime.datetime.utcnow()
+                if self._next_resync is None or now >= self._next_resync or (self.changed and self.changed()):
+                    self.resync()
+
+                with self._wakeup:
+                    now = datetime.datetime.utcnow()
+                    due = self._pop_due(now) or self._poked
+                    self._poked = False
+                    if not due:
+                        wake_at = self._next_resync
+                        if self._heap and self._heap[0][0] < wake_at:
+                            wake_at = self._heap[0][0]
+                        if self.changed:
+                            wake_at = min(wake_at, now + datetime.timedelta(seconds=self.poll_seconds))
+                        self._wakeup.wait(timeout=max(0.0, (wake_at - now).total_seconds()))
+                        continue
+
+                self.dispatch_count += 1
+                self.dispatch()
+            except Exception as e:
+                logger.error(f"Scheduler exception: {e}")
+                # Avoid a hot loop if the database is unavailable
+                with self._wakeup:
+                    self._wakeup.wait(timeout=5)
+
+
+class PostDispatcher:
+    """
+    Bounded concurrent executor for outbound posts.
+
+    Each due row is handed to `handler(row)` on a pool thread, so one slow
+    Telegram or Discord call no longer delays every post queued behind it.
+    A per-platform limit caps how many posts to the same service run at once:
+    posts wait in their platform's queue and only reach the shared pool once a
+    slot for that platform is free, so a backlog on one platform never ties up
+    pool threads that another platform's posts could use.
+    """
+
+    def __init__(self, handler, max_workers=8, platform_limits=None, default_limit=2, on_done=None):
+        """on_done() is called after each post finishes, e.g. to claim more work"""
+        self.handler = handler
+        self.on_done = on_done
+        self.max_workers = max_workers
+        self.platform_limits = dict(platform_limits or {})
+        self.default_limit = default_limit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='post-dispatch')
+        self._queues = {}
+        self._lock = threading.Lock()
+        self.in_flight = {}
+        self.submitted = 0
+        self.completed = 0
+
+    def submit(self, platform, row):
+        with self._lock:
+            self.submitted += 1
+            self._queues.setdefault(platform, deque()).append(row)
+        self._pump(platform)
+
+    def _pump(self, platform):
+        # Move queued posts to the pool while the platform has free slots
+        limit = self.platform_limits.get(platform, self.default_limit)
+        while True:
+            with self._lock:
+                queue = self._queues.get(platform)
+                if not queue or self.in_flight.get(platform, 0) >= limit:
+                    return
+                row = queue.popleft()
+                self.in_flight[platform] = self.in_flight.get(platform, 0) + 1
+            self._executor.submit(self._run, platform, row)
+
+    def _run(self, platform, row):
+        try:
+            self.handler(row)
+        except Exception as e:
+            # The handler records per-row results itself; this only guards the pool
+            logger.error(f"Unhandled error dispatching {platform} post {row[0]}: {e}")
+        finally:
+            with self._lock:
+                self.in_flight[platform] -= 1
+                self.completed += 1
+            self._pump(platform)
+            if self.on_done:
+                self.on_done()
+
+    def free_threads(self):
+        """Posts that can be submitted without waiting for a pool thread."""
+        with self._lock:
+            return max(0, self.max_workers - (self.submitted - self.completed))
+
+    def free_slots(self):
+        """
+        {platform: posts that can be submitted without queueing behind its limit}: each
+        platform's limit minus its posts running or queued. Platforms without their own
+        limit share `default_limit` under the key None.
+        """
+        with self._lock:
+            outstanding = {platform: self.in_flight.get(platform, 0) + len(self._queues.get(platform, ()))
+                           for platform in set(self.in_flight) | set(self._queues)}
+        slots = {platform: max(0, limit - outstanding.get(platform, 0))
+                 for platform, limit in self.platform_limits.items()}
+        others = sum(count for platform, count in outstanding.items() if platform not in self.platform_limits)
+        slots[None] = max(0, self.default_limit - others)
+        return slots
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'platform_limits': dict(self.platform_limits, default=self.default_limit),
+                'in_flight': dict(self.in_flight),
+                'queued': {platform: len(queue) for platform, queue in self._queues.items()},
+                'submitted': self.submitted,
+                'completed': self.completed
+            }
+
+
+class LeaseRenewer:
+    """
+    Background thread that keeps this process's row leases alive while posts are
+    in flight, so a slow post isn't reclaimed by another worker. Rows are added
+    with `hold()` when claimed and dropped with `release()` once their result is stored.
+    """
+
+    def __init__(self, renew, interval_seconds=40):
+        """renew(row_ids) extends the lease on each row still held by this worker"""
+        self.renew = renew
+        self.interval_seconds = interval_seconds
+        self._held = set()
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='lease-renewer')
+
+    def start(self):
+        self._thread.start()
+
+    def hold(self, row_id):
+        with self._lock:
+            self._held.add(row_id)
+
+    def release(self, row_id):
+        with self._lock:
+            self._held.discard(row_id)
+
+    def held(self):
+        with self._lock:
+            return sorted(self._held)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_seconds)
+            row_ids = self.held()
+            if not row_ids:
+                continue
+            try:
+                self.renew(row_ids)
+            except Exception as e:
+                logger.error(f"Lease renewal failed for {len(row_ids)} posts: {e}")
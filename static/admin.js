@@ -123,6 +123,25 @@ function adminApp() {
             }
         },
 
+        // move a dead/failed post back to the queue
+        async requeuePost(postId) {
+            this.loading = true;
+            try {
+                const res = await fetch(`/admin/api/requeue_post/${postId}`, { method: 'POST' });
+                const data = await res.json();
+                if (data.success) {
+                    this.successMessage = data.message || 'Post re-queued';
+                } else {
+                    this.error = data.error || 'Failed to re-queue post';
+                }
+            } catch (e) {
+                this.error = 'Network error: ' + (e.message || e);
+            } finally {
+                this.loading = false;
+                await this.refreshAll();
+            }
+        },
+
         // view a specific video JSON/details via id
         viewVideoJson(videoId) {
             this.selectedVideoId = videoId;
@@ -245,8 +264,12 @@ function adminApp() {
                     return 'bg-green-100 text-green-700';
                 case 'posting':
                     return 'bg-yellow-100 text-yellow-700';
+                case 'retrying':
+                    return 'bg-orange-100 text-orange-700';
                 case 'failed':
                     return 'bg-red-100 text-red-700';
+                case 'dead':
+                    return 'bg-red-200 text-red-800';
                 default:
                     return 'bg-gray-100 text-gray-700';
             }
@@ -260,8 +283,12 @@ function adminApp() {
                     return 'bg-green-100 text-green-700';
                 case 'posting':
                     return 'bg-yellow-100 text-yellow-700';
+                case 'retrying':
+                    return 'bg-orange-100 text-orange-700';
                 case 'failed':
                     return 'bg-red-100 text-red-700';
+                case 'dead':
+                    return 'bg-red-200 text-red-800';
                 default:
                     return 'bg-gray-100 text-gray-700';
             }
@@ -9,6 +9,7 @@ function app() {
         error: '',
         successMessage: '',
         loadingTranscript: false,
+        transcriptStage: '',
         loadingSummary: false,
         hasTranscript: false,
         discordConfigured: false,
@@ -78,7 +79,14 @@ function app() {
                     body: JSON.stringify({ youtube_url: this.youtubeUrl })
                 });
 
-                const data = await response.json();
+                const submitted = await response.json();
+                if (!submitted.success) {
+                    this.error = submitted.error || 'Failed to get transcript';
+                    return;
+                }
+
+                // The pipeline runs as a background job - poll until it finishes
+                const data = await this.waitForJob(submitted.job_id);
 
                 if (data.success) {
                     this.videoDetails = data.video_details;
@@ -98,6 +106,34 @@ function app() {
                 this.error = 'Network error: ' + error.message;
             } finally {
                 this.loadingTranscript = false;
+                this.transcriptStage = '';
+            }
+        },
+
+        // Poll /job_status until the job finishes; resolves with the job result payload
+        async waitForJob(jobId, intervalMs = 2000) {
+            const stageLabels = {
+                fetching_details: 'Fetching video details...',
+                downloading: 'Downloading audio...',
+                transcribing: 'Transcribing...',
+                summarizing: 'Summarizing...',
+                saving: 'Saving...'
+            };
+            while (true) {
+                const response = await fetch(`/job_status/${jobId}`);
+                const data = await response.json();
+                if (!data.success) {
+                    return { success: false, error: data.error || 'Job not found' };
+                }
+                const job = data.job;
+                if (job.status === 'succeeded') {
+                    return job.result;
+                }
+                if (job.status === 'failed') {
+                    return { success: false, error: job.error || 'Job failed' };
+                }
+                this.transcriptStage = stageLabels[job.stage] || 'Queued...';
+                await new Promise(resolve => setTimeout(resolve, intervalMs));
             }
         },
 
@@ -0,0 +1,231 @@
+import os
+import re
+
+# Number of transcript chunks sent through the summarizer per forward pass
+SUMMARY_BATCH_SIZE = max(1, int(os.getenv('SUMMARY_BATCH_SIZE', '4')))
+
+# Token budget per summarization chunk (capped under the model's input limit once it is loaded)
+# and overlap between chunks
+SUMMARY_CHUNK_TOKENS = int(os.getenv('SUMMARY_CHUNK_TOKENS', '1000'))
+SUMMARY_CHUNK_OVERLAP = max(0, int(os.getenv('SUMMARY_CHUNK_OVERLAP', '0')))
+
+# Chunked summarization shared by the app and benchmark_summarization.py. Every
+# function takes the summarization pipeline (or anything callable like one) first.
+
+
+def chunk_token_budget(summarizer):
+    """SUMMARY_CHUNK_TOKENS, capped to leave room for special tokens under the summarizer's input limit."""
+    max_input = getattr(getattr(summarizer, 'tokenizer', None), 'model_max_length', 1024)
+    if not max_input or max_input > 100000:
+        max_input = 1024
+    return min(SUMMARY_CHUNK_TOKENS, max_input - 24)
+
+
+def chunk_text_for_summarization(summarizer, text, max_tokens=None, overlap_tokens=None):
+    """
+    Split text into chunks of at most `max_tokens` summarizer tokens while preserving
+    sentence boundaries. Sentences are packed greedily; the last `overlap_tokens` worth
+    of sentences from one chunk are repeated at the start of the next for context.
+    Sentences longer than the budget are split on word boundaries, so nothing is truncated.
+    """
+    max_tokens = max_tokens or chunk_token_budget(summarizer)
+    overlap_tokens = SUMMARY_CHUNK_OVERLAP if overlap_tokens is None else overlap_tokens
+
+    sentences = [sentence for sentence in re.split(r'(?<=[.!?])\s+', text.strip()) if sentence]
+    pieces = []
+    for sentence, length in zip(sentences, token_lengths(summarizer, sentences)):
+        if length <= max_tokens:
+            pieces.append((sentence, length))
+        else:
+            pieces.extend(split_long_sentence(summarizer, sentence, max_tokens))
+
+    chunks = []
+    current = []
+    current_len = 0
+    for piece, length in pieces:
+        if current and current_len + length > max_tokens:
+            chunks.append(' '.join(p for p, _ in current))
+
+            # Carry trailing sentences over as overlap, if they leave room for this one
+            carried = []
+            carried_len = 0
+            for p, l in reversed(current):
+                if carried_len + l > overlap_tokens:
+                    break
+                carried.insert(0, (p, l))
+                carried_len += l
+            if carried_len + length > max_tokens:
+                carried, carried_len = [], 0
+            current, current_len = carried, carried_len
+
+        current.append((piece, length))
+        current_len += length
+
+    # Add the last chunk if it's not empty
+    if current:
+        chunks.append(' '.join(p for p, _ in current))
+
+    print(f"Split text into {len(chunks)} chunks for summarization (max {max_tokens} tokens each)")
+    return chunks
+
+
+def split_long_sentence(summarizer, sentence, max_tokens):
+    """Split a sentence that exceeds the token budget into word runs of at most `max_tokens` tokens."""
+    words = sentence.split()
+    parts = []
+    current = []
+    current_len = 0
+    for word, length in zip(words, token_lengths(summarizer, [' ' + word for word in words])):
+        if current and current_len + length > max_tokens:
+            parts.append((' '.join(current), current_len))
+            current, current_len = [], 0
+        current.append(word)
+        current_len += length
+    if current:
+        parts.append((' '.join(current), current_len))
+    return parts
+
+
+def generate_summary(summarizer, text, max_length):
+    """
+    Run the summarization model over cleaned text, chunking long texts
+    """
+    # If text is short, summarize directly
+    if len(text) < 800:
+        summary = summarizer(
+            text,
+            max_length=max_length,
+            min_length=max(30, max_length // 3),
+            do_sample=False,
+            truncation=True
+        )
+        return summary[0]['summary_text']
+
+    # For longer texts, use chunking strategy
+    chunks = chunk_text_for_summarization(summarizer, text)
+
+    if len(chunks) == 1:
+        # Single chunk - summarize directly
+        summary = summarizer(
+            chunks[0],
+            max_length=max_length,
+            min_length=max(30, max_length // 3),
+            do_sample=False,
+            truncation=True
+        )
+        return summary[0]['summary_text']
+    else:
+        # Multiple chunks - summarize each (in batches) and combine
+        chunk_max_len = max(min(max_length // len(chunks), 100), 50)
+        chunk_summaries = summarize_chunks(summarizer, chunks, chunk_max_len)
+
+        # Combine chunk summaries and create final summary
+        combined_text = ' '.join(chunk_summaries)
+
+        # If combined text is still long, do a final summarization
+        if len(combined_text) > 500:
+            final_summary = summarizer(
+                combined_text,
+                max_length=max_length,
+                min_length=max(30, max_length // 3),
+                do_sample=False,
+                truncation=True
+            )
+            return final_summary[0]['summary_text']
+        else:
+            return combined_text
+
+
+def summarize_chunks(summarizer, chunks, chunk_max_len, batch_size=None):
+    """
+    Summarize every chunk in batched pipeline calls, preserving chunk order.
+
+    Chunks are grouped by token length before batching so each padded batch wastes
+    as little compute as possible. If a batch fails, its chunks are retried one by
+    one so a single bad chunk only falls back to its first few sentences.
+    """
+    batch_size = batch_size or SUMMARY_BATCH_SIZE
+    generation_kwargs = dict(
+        max_length=chunk_max_len,
+        min_length=max(20, chunk_max_len // 3),
+        do_sample=False,
+        truncation=True
+    )
+
+    # Padding-aware grouping: order chunks by length, batch neighbours together
+    lengths = token_lengths(summarizer, chunks)
+    order = sorted(range(len(chunks)), key=lambda i: lengths[i])
+    chunk_summaries = [None] * len(chunks)
+
+    for start in range(0, len(order), batch_size):
+        batch_indices = order[start:start + batch_size]
+        batch = [chunks[i] for i in batch_indices]
+        try:
+            outputs = summarizer(batch, batch_size=len(batch), **generation_kwargs)
+            for i, output in zip(batch_indices, outputs):
+                chunk_summaries[i] = output['summary_text']
+            print(f"Summarized {len(batch)} chunks in one batch")
+        except Exception as e:
+            print(f"Batched chunk summarization failed, retrying chunk by chunk: {e}")
+            for i in batch_indices:
+                chunk_summaries[i] = summarize_single_chunk(summarizer, chunks[i], i, len(chunks), generation_kwargs)
+
+    return chunk_summaries
+
+
+def summarize_single_chunk(summarizer, chunk, index, total, generation_kwargs):
+    try:
+        chunk_summary = summarizer(chunk, **generation_kwargs)
+        print(f"Summarized chunk {index + 1}/{total}")
+        return chunk_summary[0]['summary_text']
+    except Exception as e:
+        print(f"Error summarizing chunk {index + 1}: {e}")
+        # Fallback: take first few sentences
+        sentences = chunk.split('. ')
+        return '. '.join(sentences[:3]) + '.'
+
+
+def token_lengths(summarizer, texts):
+    """
+    Token counts under the summarizer's tokenizer, computed in one batched call.
+    Falls back to a ~4 characters per token estimate if the pipeline has no tokenizer.
+    """
+    if not texts:
+        return []
+    tokenizer = getattr(summarizer, 'tokenizer', None)
+    if tokenizer is None:
+        return [len(text) // 4 + 1 for text in texts]
+    return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)['input_ids']]
+
+
+def generate_summaries(summarizer, text, max_lengths, budget_length=None):
+    """
+    Run the summarization model once over cleaned text for several target lengths.
+    Chunk summaries get the per-chunk budget `budget_length` would get on its own
+    (default: the largest of `max_lengths`).
+    """
+    chunks = [text] if len(text) < 800 else chunk_text_for_summarization(summarizer, text)
+
+    if len(chunks) == 1:
+        # Single chunk - summarize directly for each length
+        source_text = chunks[0]
+    else:
+        # Shared chunk-level summaries
+        budget_length = budget_length or max(max_lengths)
+        chunk_max_len = max(min(budget_length // len(chunks), 100), 50)
+        source_text = ' '.join(summarize_chunks(summarizer, chunks, chunk_max_len))
+
+    summaries = {}
+    for max_length in max_lengths:
+        if len(chunks) > 1 and len(source_text) <= 500:
+            summaries[max_length] = source_text
+            continue
+        summary = summarizer(
+            source_text,
+            max_length=max_length,
+            min_length=max(30, max_length // 3),
+            do_sample=False,
+            truncation=True
+        )
+        summaries[max_length] = summary[0]['summary_text']
+    return summaries
@@ -0,0 +1,58 @@
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# pytorch: the model as published (fp32 on CPU)
+# int8:    PyTorch dynamic quantization of every Linear layer to int8 (CPU only)
+# onnx:    ONNX Runtime export via optimum, cached on disk after the first export
+ENGINES = ('pytorch', 'int8', 'onnx')
+
+
+def engine_model_name(model_name, engine):
+    """Name the summary cache keys on; engines other than pytorch can word summaries differently."""
+    return model_name if engine == 'pytorch' else f"{model_name}@{engine}"
+
+
+def onnx_export_dir(model_name, base_dir=None):
+    base_dir = base_dir or os.getenv('ONNX_EXPORT_DIR', 'onnx_models')
+    return os.path.join(base_dir, re.sub(r'[^\w.-]+', '_', model_name))
+
+
+def load_onnx_model(model_name):
+    """ORTModelForSeq2SeqLM for `model_name`, exported on first use and reloaded from disk afterwards."""
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    export_dir = onnx_export_dir(model_name)
+    if os.path.isdir(export_dir):
+        return ORTModelForSeq2SeqLM.from_pretrained(export_dir)
+    logger.info(f"Exporting {model_name} to ONNX in {export_dir} (one-time)")
+    model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+    model.save_pretrained(export_dir)
+    return model
+
+
+def build_summarization_pipeline(model_name, engine="pytorch", device="cpu"):
+    """A transformers summarization pipeline for `model_name` running on `engine`."""
+    from transformers import pipeline, AutoTokenizer
+
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown summarization engine {engine!r}; expected one of {', '.join(ENGINES)}")
+    device_index = 0 if device == "cuda" else -1
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+    if engine == 'onnx':
+        # ONNX Runtime picks its own execution provider; the pipeline runs on CPU
+        return pipeline("summarization", model=load_onnx_model(model_name), tokenizer=tokenizer)
+
+    from transformers import AutoModelForSeq2SeqLM
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+    if engine == 'int8':
+        if device == "cuda":
+            raise ValueError("int8 dynamic quantization runs on CPU only; use the pytorch engine on CUDA")
+        import torch
+
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline("summarization", model=model, tokenizer=tokenizer, device=device_index)
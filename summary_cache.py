@@ -0,0 +1,102 @@
+import hashlib
+import json
+import threading
+import time
+import logging
+import db
+
+logger = logging.getLogger(__name__)
+
+
+def summary_cache_key(transcript, **params):
+    """
+    Build a cache key from the transcript hash and every parameter that changes the
+    summary (model name, max/min length, chunking settings).
+    """
+    transcript_hash = hashlib.sha256(transcript.encode()).hexdigest()
+    return hashlib.sha256(json.dumps([transcript_hash, params], sort_keys=True).encode()).hexdigest()
+
+
+class SummaryCache:
+    """
+    Persistent, size-bounded LRU cache of generated summaries backed by SQLite.
+    Entries beyond `max_entries` are evicted least-recently-used first.
+    """
+
+    def __init__(self, db_file="summary_cache.db", max_entries=5000):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._counter_lock = threading.Lock()
+        with db.connection(db_file) as conn:
+            conn.execute("""
+                         CREATE TABLE IF NOT EXISTS summaries
+                         (
+                             cache_key   TEXT PRIMARY KEY,
+                             summary     TEXT NOT NULL,
+                             created_at  REAL NOT NULL,
+                             last_access REAL NOT NULL
+                         )
+                         """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_access ON summaries (last_access)")
+
+    def _count(self, counter, amount=1):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get(self, key):
+        """Return the cached summary (refreshing its LRU position), or None on a miss."""
+        try:
+            with db.connection(self.db_file) as conn:
+                row = conn.execute("SELECT summary FROM summaries WHERE cache_key = ?", (key,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE summaries SET last_access = ? WHERE cache_key = ?", (time.time(), key))
+        except Exception as e:
+            logger.error(f"Error reading summary cache: {e}")
+            row = None
+        if row is None:
+            self._count('misses')
+            return None
+        self._count('hits')
+        return row[0]
+
+    def put(self, key, summary):
+        """Store a summary and evict the least recently used entries over the size bound."""
+        try:
+            now = time.time()
+            with db.connection(self.db_file) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries (cache_key, summary, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, summary, now, now))
+                count = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    conn.execute("""
+                                 DELETE FROM summaries
+                                 WHERE cache_key IN (SELECT cache_key
+                                                     FROM summaries
+                                                     ORDER BY last_access ASC LIMIT ?)
+                                 """, (excess,))
+            if excess > 0:
+                self._count('evictions', excess)
+        except Exception as e:
+            logger.error(f"Error writing summary cache: {e}")
+
+    def stats(self):
+        """Hit/miss counters and current size for the admin dashboard."""
+        try:
+            with db.connection(self.db_file) as conn:
+                size = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        except Exception:
+            size = None
+        lookups = self.hits + self.misses
+        return {
+            'entries': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else None
+        }
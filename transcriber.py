@@ -0,0 +1,139 @@
+import logging
+import importlib.util
+from importlib import metadata
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('whisper', 'faster-whisper')
+# Import name and distribution name of each backend's library
+BACKEND_PACKAGES = {'whisper': ('whisper', 'openai-whisper'), 'faster-whisper': ('faster_whisper', 'faster-whisper')}
+
+
+def resolve_backend(backend):
+    """The backend that will actually run: faster-whisper falls back to whisper when not installed."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+    if backend != 'whisper' and importlib.util.find_spec(BACKEND_PACKAGES[backend][0]) is None:
+        logger.warning(f"{backend} is not installed, falling back to whisper")
+        return 'whisper'
+    return backend
+
+
+def library_version(backend):
+    try:
+        return metadata.version(BACKEND_PACKAGES[backend][1])
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def default_compute_type(backend, device):
+    if device == "cuda":
+        return "float16"
+    return "int8" if backend == 'faster-whisper' else "float32"
+
+
+def default_beam_size(backend, beam_size):
+    # faster-whisper decodes with beam search by default; whisper keeps its own default
+    return beam_size or (5 if backend == 'faster-whisper' else None)
+
+
+class WhisperTranscriber:
+    """Reference openai-whisper (PyTorch) backend."""
+
+    backend = 'whisper'
+
+    def __init__(self, model_size="base", device="cpu", cpu_threads=None, beam_size=None):
+        import torch
+        import whisper
+
+        if cpu_threads and device == "cpu":
+            torch.set_num_threads(cpu_threads)
+        self.model_size = model_size
+        self.device = device
+        self.cpu_threads = cpu_threads
+        self.beam_size = default_beam_size(self.backend, beam_size)
+        self.compute_type = default_compute_type(self.backend, device)
+        self.library_version = library_version(self.backend)
+        self._model = whisper.load_model(model_size, device=device)
+
+    def transcribe(self, audio):
+        # audio: a file path, or 16 kHz mono float32 samples (audio_stream.load_audio)
+        options = {'beam_size': self.beam_size} if self.beam_size else {}
+        result = self._model.transcribe(audio, fp16=self.device == "cuda", **options)
+        return {
+            'text': result['text'],
+            'language': result.get('language'),
+            'segments': [{'start': s['start'], 'end': s['end'], 'text': s['text']}
+                         for s in result.get('segments', [])]
+        }
+
+
+class FasterWhisperTranscriber:
+    """
+    faster-whisper backend: the same Whisper weights converted to CTranslate2, run
+    with int8 (or int8_float16 / float16) kernels. Several times faster than the
+    reference implementation on CPU at equal accuracy.
+    """
+
+    backend = 'faster-whisper'
+
+    def __init__(self, model_size="base", device="cpu", compute_type=None, cpu_threads=None, beam_size=None):
+        import faster_whisper
+
+        self.model_size = model_size
+        self.device = device
+        self.cpu_threads = cpu_threads
+        self.beam_size = default_beam_size(self.backend, beam_size)
+        self.compute_type = compute_type or default_compute_type(self.backend, device)
+        self.library_version = library_version(self.backend)
+        self._model = faster_whisper.WhisperModel(model_size, device=device, compute_type=self.compute_type,
+                                                  cpu_threads=cpu_threads or 0)
+
+    def transcribe(self, audio):
+        segments, info = self._model.transcribe(audio, beam_size=self.beam_size)
+        # segments is a lazy generator: decoding happens while we iterate
+        segments = [{'start': s.start, 'end': s.end, 'text': s.text} for s in segments]
+        return {
+            'text': ''.join(s['text'] for s in segments),
+            'language': info.language,
+            'segments': segments
+        }
+
+
+def create_transcriber(backend="whisper", model_size="base", device="cpu", compute_type=None,
+                       cpu_threads=None, beam_size=None):
+    """Build the configured transcription backend."""
+    if backend == 'faster-whisper':
+        return FasterWhisperTranscriber(model_size, device=device, compute_type=compute_type,
+                                        cpu_threads=cpu_threads, beam_size=beam_size)
+    if backend == 'whisper':
+        return WhisperTranscriber(model_size, device=device, cpu_threads=cpu_threads, beam_size=beam_size)
+    raise ValueError(f"Unknown transcription backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+def model_identity(backend, model_size, device="cpu", compute_type=None, beam_size=None):
+    """
+    (model name, model version) for the transcript cache key, computed from the
+    configuration without loading the model. Anything that changes the output text
+    is included, so switching backend, size or precision never serves a transcript
+    produced by a different configuration.
+    """
+    name = f"{backend}:{model_size}"
+    # whisper has no int8 path, so its precision only depends on the device
+    if backend != 'faster-whisper' or not compute_type:
+        compute_type = default_compute_type(backend, device)
+    beam_size = default_beam_size(backend, beam_size)
+    version = f"{library_version(backend)}:{compute_type}:beam{beam_size or 'default'}"
+    return name, version
+
+
+def describe(transcriber):
+    return {
+        'backend': transcriber.backend,
+        'model_size': transcriber.model_size,
+        'device': transcriber.device,
+        'compute_type': transcriber.compute_type,
+        'beam_size': transcriber.beam_size,
+        'library_version': transcriber.library_version,
+        'cpu_threads': transcriber.cpu_threads
+    }
@@ -0,0 +1,55 @@
+import os
+import json
+import hashlib
+import datetime
+import logging
+from json_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """
+    On-disk transcript cache keyed by the canonical YouTube video id (from yt_dlp)
+    plus the transcription model name and version, so every URL form of the same
+    video shares one entry and a model upgrade never serves stale transcripts.
+    """
+
+    def __init__(self, cache_dir="transcript_cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, video_id, model_name, model_version):
+        key = f"{video_id}|{model_name}|{model_version}"
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def get(self, video_id, model_name, model_version):
+        """Return the cached transcript, or None on a miss."""
+        if not video_id:
+            return None
+        path = self._path(video_id, model_name, model_version)
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)['transcript']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading transcript cache entry {path}: {e}")
+            return None
+
+    def put(self, video_id, model_name, model_version, transcript):
+        """Store a transcript (written atomically via temp file and rename)."""
+        if not video_id:
+            return
+        path = self._path(video_id, model_name, model_version)
+        entry = {
+            'video_id': video_id,
+            'model_name': model_name,
+            'model_version': model_version,
+            'transcript': transcript,
+            'created_at': datetime.datetime.utcnow().isoformat()
+        }
+        try:
+            atomic_write_json(path, entry)
+        except Exception as e:
+            logger.error(f"Error writing transcript cache entry for {video_id}: {e}")
@@ -0,0 +1,325 @@
+import os
+import copy
+import json
+import threading
+import datetime
+import logging
+from collections import OrderedDict
+import db
+
+logger = logging.getLogger(__name__)
+
+
+class VideoStore:
+    """
+    SQLite-backed store for processed videos, replacing the monolithic video_data.json.
+
+    Each video is one row (transcript, summaries, details) and every saved summary is a
+    row in saved_summaries, so an update touches a single video instead of rewriting
+    the whole history. `get()` returns records in the same shape video_data.json used:
+    {'transcript', 'summarized_transcript', 'details', 'summaries', 'saved_by'}.
+    """
+
+    def __init__(self, db_file="video_data.db"):
+        self.db_file = db_file
+        self._init_schema()
+
+    def _init_schema(self):
+        with db.connection(self.db_file) as conn:
+            conn.executescript("""
+                               CREATE TABLE IF NOT EXISTS videos
+                               (
+                                   video_id              TEXT PRIMARY KEY,
+                                   title                 TEXT,
+                                   uploader              TEXT,
+                                   details               TEXT NOT NULL DEFAULT '{}',
+                                   transcript            TEXT,
+                                   summarized_transcript TEXT,
+                                   summaries             TEXT,
+                                   created_at            TEXT NOT NULL,
+                                   updated_at            TEXT NOT NULL
+                               );
+                               CREATE INDEX IF NOT EXISTS idx_videos_uploader ON videos (uploader);
+
+                               CREATE TABLE IF NOT EXISTS saved_summaries
+                               (
+                                   id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                                   video_id   TEXT NOT NULL,
+                                   user_email TEXT NOT NULL,
+                                   user_name  TEXT,
+                                   text       TEXT NOT NULL,
+                                   saved_at   TEXT NOT NULL
+                               );
+                               CREATE INDEX IF NOT EXISTS idx_saved_summaries_video_id
+                                   ON saved_summaries (video_id, user_email);
+
+                               CREATE TABLE IF NOT EXISTS video_deletions
+                               (
+                                   video_id TEXT PRIMARY KEY,
+                                   revision INTEGER NOT NULL
+                               );
+                               CREATE TABLE IF NOT EXISTS store_revision
+                               (
+                                   id       INTEGER PRIMARY KEY CHECK (id = 1),
+                                   revision INTEGER NOT NULL
+                               );
+                               INSERT OR IGNORE INTO store_revision (id, revision) VALUES (1, 0);
+
+                               CREATE TABLE IF NOT EXISTS store_meta
+                               (
+                                   key   TEXT PRIMARY KEY,
+                                   value TEXT NOT NULL
+                               );
+                               """)
+            columns = [row['name'] for row in conn.execute("PRAGMA table_info(videos)")]
+            if 'revision' not in columns:
+                conn.execute("ALTER TABLE videos ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_revision ON videos (revision)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_video_deletions_revision ON video_deletions (revision)")
+
+    def _next_revision(self, conn):
+        # Runs inside the caller's transaction, so the bump commits with the write it stamps.
+        conn.execute("UPDATE store_revision SET revision = revision + 1 WHERE id = 1")
+        return conn.execute("SELECT revision FROM store_revision WHERE id = 1").fetchone()[0]
+
+    # -------------------------------
+    # Reads
+    # -------------------------------
+    def __contains__(self, video_id):
+        with db.connection(self.db_file) as conn:
+            row = conn.execute("SELECT 1 FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with db.connection(self.db_file) as conn:
+            return conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def revision(self):
+        """Monotonic counter bumped by every write, used by VideoStoreView to detect changes."""
+        with db.connection(self.db_file) as conn:
+            return conn.execute("SELECT revision FROM store_revision WHERE id = 1").fetchone()[0]
+
+    def changes_since(self, revision):
+        """Return (changed_video_ids, deleted_video_ids) written after `revision`."""
+        with db.connection(self.db_file) as conn:
+            changed = [row[0] for row in conn.execute(
+                "SELECT video_id FROM videos WHERE revision > ?", (revision,))]
+            deleted = [row[0] for row in conn.execute(
+                "SELECT video_id FROM video_deletions WHERE revision > ?", (revision,))]
+        return changed, deleted
+
+    def keys(self):
+        with db.connection(self.db_file) as conn:
+            return [row[0] for row in conn.execute("SELECT video_id FROM videos ORDER BY created_at")]
+
+    def get(self, video_id):
+        """Return one video record in the legacy video_data shape, or None."""
+        with db.connection(self.db_file) as conn:
+            row = conn.execute("SELECT * FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+            if row is None:
+                return None
+            saved_rows = conn.execute(
+                "SELECT * FROM saved_summaries WHERE video_id = ? ORDER BY id", (video_id,)).fetchall()
+        return self._to_record(row, saved_rows)
+
+    def all(self):
+        """Return every video as {video_id: record} (admin dashboard)."""
+        with db.connection(self.db_file) as conn:
+            rows = conn.execute("SELECT * FROM videos ORDER BY created_at").fetchall()
+            saved_rows = conn.execute("SELECT * FROM saved_summaries ORDER BY id").fetchall()
+        saved_by_video = {}
+        for saved in saved_rows:
+            saved_by_video.setdefault(saved['video_id'], []).append(saved)
+        return {row['video_id']: self._to_record(row, saved_by_video.get(row['video_id'], [])) for row in rows}
+
+    def find_by_uploader(self, uploader):
+        with db.connection(self.db_file) as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT video_id FROM videos WHERE uploader = ? ORDER BY created_at", (uploader,))]
+
+    @staticmethod
+    def _to_record(row, saved_rows):
+        record = {
+            'transcript': row['transcript'],
+            'summarized_transcript': row['summarized_transcript'],
+            'details': json.loads(row['details'] or '{}'),
+        }
+        if row['summaries'] is not None:
+            record['summaries'] = json.loads(row['summaries'])
+        if saved_rows:
+            saved_by = {}
+            for saved in saved_rows:
+                saved_by.setdefault(saved['user_email'], []).append({
+                    'text': saved['text'],
+                    'saved_at': saved['saved_at'],
+                    'user': {'email': saved['user_email'], 'name': saved['user_name']}
+                })
+            record['saved_by'] = saved_by
+        return record
+
+    # -------------------------------
+    # Writes (each touches a single video)
+    # -------------------------------
+    def put(self, video_id, record):
+        """
+        Insert or replace a video's transcript, summaries and details.
+        Saved summaries for the video are kept.
+        """
+        details = record.get('details') or {}
+        summaries = record.get('summaries')
+        now = datetime.datetime.utcnow().isoformat()
+        with db.connection(self.db_file) as conn:
+            revision = self._next_revision(conn)
+            conn.execute("""
+                         INSERT INTO videos (video_id, title, uploader, details, transcript,
+                                             summarized_transcript, summaries, created_at, updated_at,
+                                             revision)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                         ON CONFLICT(video_id) DO UPDATE SET title                 = excluded.title,
+                                                             uploader              = excluded.uploader,
+                                                             details               = excluded.details,
+                                                             transcript            = excluded.transcript,
+                                                             summarized_transcript = excluded.summarized_transcript,
+                                                             summaries             = excluded.summaries,
+                                                             updated_at            = excluded.updated_at,
+                                                             revision              = excluded.revision
+                         """, (video_id, details.get('title'), details.get('uploader'), json.dumps(details),
+                               record.get('transcript'), record.get('summarized_transcript'),
+                               json.dumps(summaries) if summaries is not None else None, now, now,
+                               revision))
+            conn.execute("DELETE FROM video_deletions WHERE video_id = ?", (video_id,))
+
+    def update_summaries(self, video_id, summaries):
+        with db.connection(self.db_file) as conn:
+            conn.execute("UPDATE videos SET summaries = ?, updated_at = ?, revision = ? WHERE video_id = ?",
+                         (json.dumps(summaries), datetime.datetime.utcnow().isoformat(),
+                          self._next_revision(conn), video_id))
+
+    def add_saved_summary(self, video_id, user_email, user_name, text, saved_at=None):
+        """Record a summary saved by a user; returns how many that user has saved for the video."""
+        saved_at = saved_at or datetime.datetime.utcnow().isoformat()
+        with db.connection(self.db_file) as conn:
+            conn.execute("""
+                         INSERT INTO saved_summaries (video_id, user_email, user_name, text, saved_at)
+                         VALUES (?, ?, ?, ?, ?)
+                         """, (video_id, user_email, user_name, text, saved_at))
+            conn.execute("UPDATE videos SET revision = ? WHERE video_id = ?", (self._next_revision(conn), video_id))
+            return conn.execute(
+                "SELECT COUNT(*) FROM saved_summaries WHERE video_id = ? AND user_email = ?",
+                (video_id, user_email)).fetchone()[0]
+
+    def delete(self, video_id):
+        """Delete a video and its saved summaries; returns False if it did not exist."""
+        with db.connection(self.db_file) as conn:
+            cursor = conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+            conn.execute("DELETE FROM saved_summaries WHERE video_id = ?", (video_id,))
+            if cursor.rowcount > 0:
+                conn.execute("INSERT OR REPLACE INTO video_deletions (video_id, revision) VALUES (?, ?)",
+                             (video_id, self._next_revision(conn)))
+            return cursor.rowcount > 0
+
+    # -------------------------------
+    # One-time migration from video_data.json
+    # -------------------------------
+    def migrate_from_json(self, json_file):
+        """
+        Import a legacy video_data.json into the store, then rename the file to
+        <name>.migrated. The import and a 'json_migrated' marker commit together
+        under BEGIN IMMEDIATE, so when several workers start at once (or one crashed
+        before renaming) the file is imported exactly once. Returns the number of
+        videos imported by this call.
+        """
+        if not os.path.exists(json_file):
+            return 0
+        try:
+            with open(json_file, 'r') as f:
+                legacy = json.load(f)
+        except FileNotFoundError:
+            return 0  # another worker renamed it after importing
+        except Exception as e:
+            logger.error(f"Error reading legacy video data {json_file}: {e}")
+            return 0
+
+        imported = 0
+        with db.connection(self.db_file) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            marker = conn.execute("SELECT value FROM store_meta WHERE key = 'json_migrated'").fetchone()
+            if marker is None:
+                for video_id, record in legacy.items():
+                    self.put(video_id, record)
+                    for user_email, entries in (record.get('saved_by') or {}).items():
+                        for entry in entries:
+                            conn.execute("""
+                                         INSERT INTO saved_summaries (video_id, user_email, user_name, text, saved_at)
+                                         VALUES (?, ?, ?, ?, ?)
+                                         """, (video_id, user_email, (entry.get('user') or {}).get('name'),
+                                               entry.get('text', ''), entry.get('saved_at') or ''))
+                conn.execute("INSERT INTO store_meta (key, value) VALUES ('json_migrated', ?)",
+                             (datetime.datetime.utcnow().isoformat(),))
+                imported = len(legacy)
+
+        try:
+            os.replace(json_file, json_file + ".migrated")
+        except FileNotFoundError:
+            pass
+        if imported:
+            logger.info(f"Migrated {imported} videos from {json_file} into {self.db_file}")
+        else:
+            logger.info(f"{json_file} was already imported into {self.db_file}; renamed it")
+        return imported
+
+
+class VideoStoreView:
+    """
+    Shared, thread-safe in-process view of a VideoStore for hot read paths
+    (scheduler, posting routes). Records are cached after the first point lookup;
+    each access compares the store revision and, if another thread or process
+    wrote since, invalidates only the videos that changed instead of reloading everything.
+    """
+
+    def __init__(self, store, max_entries=1000):
+        self.store = store
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._records = OrderedDict()
+        self._revision = store.revision()
+
+    def _refresh(self):
+        # Caller holds the lock.
+        revision = self.store.revision()
+        if revision == self._revision:
+            return
+        changed, deleted = self.store.changes_since(self._revision)
+        for video_id in changed + deleted:
+            self._records.pop(video_id, None)
+        self._revision = revision
+
+    def get(self, video_id):
+        """Point lookup; returns a copy of the record (or None) so callers can't mutate the shared view."""
+        with self._lock:
+            self._refresh()
+            record = self._records.get(video_id)
+            if record is not None:
+                self._records.move_to_end(video_id)
+                return copy.deepcopy(record)
+            revision = self._revision
+
+        record = self.store.get(video_id)
+        if record is None:
+            return None
+        with self._lock:
+            # Only cache if no refresh happened during the read: the record may predate
+            # a change that refresh has already invalidated, and would then never be
+            # invalidated again. It is read again on the next lookup.
+            if self._revision == revision:
+                self._records[video_id] = record
+                while len(self._records) > self.max_entries:
+                    self._records.popitem(last=False)
+        return copy.deepcopy(record)
+
+    def __contains__(self, video_id):
+        return self.get(video_id) is not None
+
+    def stats(self):
+        with self._lock:
+            return {'cached_videos': len(self._records), 'max_entries': self.max_entries, 'revision': self._revision}